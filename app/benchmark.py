@@ -0,0 +1,330 @@
+"""Benchmarks for the subtitle processors.
+
+    python benchmark.py generate out.srt --cues 100000 --overlap 0.1
+    python benchmark.py run [--cues 20000] [--only spellcheck,pipeline]
+    python benchmark.py run --save-baseline
+    python benchmark.py startup
+
+`run` times every processor (and the full pipeline) on a synthetic file,
+each run in a fresh process so caches start cold, and compares cues/sec
+and peak memory against the stored baselines. It exits with status 1 if
+anything regressed by more than --threshold. Baselines are machine
+specific: re-save them when benchmarking on different hardware.
+
+`startup` checks that importing the entry points stays within
+IMPORT_BUDGET and doesn't pull in any of the HEAVY_MODULES, which should
+only load once the stage that needs them runs.
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from processors.subtitles import Cue, write_srt
+
+# ======= CONFIGURATION =======
+BASELINE_FILE = Path(__file__).with_name('benchmark_baselines.json')
+THRESHOLD = 0.15  # Allowed slowdown (or memory growth) before a run counts as a regression
+MEMORY_SLACK = 2 * 1024 * 1024  # Memory changes below this many bytes are noise
+REPEAT = 3  # Timed runs per benchmark; the fastest counts
+IMPORT_BUDGET = {  # Seconds to import each entry point in a fresh interpreter
+    'subfix': 0.15,
+    'processors.pipeline': 0.1,
+    'processors.translator': 0.1
+}
+HEAVY_MODULES = ('requests', 'deep_translator', 'langdetect', 'spellchecker', 'numpy')
+# =============================
+
+WORDS = (
+    "the be to of and a in that have it for not on with he as you do at this but his by from "
+    "they we say her she or an will my one all would there their what so up out if about who get "
+    "which go me when make can like time no just him know take people into year your good some "
+    "could them see other than then now look only come its over think also back after use two how "
+    "our work first well way even new want because any these give day most us really sorry right "
+    "tonight tomorrow remember believe something everything nothing listen wait where happened"
+).split()
+SDH_TAGS = ("[door slams]", "[music]", "(sighs)", "(laughs)", "[phone ringing]", "JOHN:", "MARY:", "♪ la la la ♪")
+
+
+def misspell(word, rng):
+    """Drop, double or swap a letter."""
+    if len(word) < 3:
+        return word + word[-1]
+    i = rng.randrange(len(word) - 1)
+    op = rng.randrange(3)
+    if op == 0:
+        return word[:i] + word[i + 1:]
+    if op == 1:
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+def synthetic_line(rng, line_length, typo_rate):
+    words = []
+    length = 0
+    target = max(4, int(rng.gauss(line_length, line_length / 4)))
+    while length < target:
+        word = rng.choice(WORDS)
+        if rng.random() < typo_rate:
+            word = misspell(word, rng)
+        words.append(word)
+        length += len(word) + 1
+    line = ' '.join(words)
+    return line[0].upper() + line[1:] + rng.choice('.,?!.')
+
+def synthetic_cues(cues=10000, overlap=0.05, line_length=36, typo_rate=0.02, sdh_rate=0.05, seed=0):
+    """Yield `cues` random Cues.
+
+    overlap      fraction of cues that start before the previous one ends
+    line_length  mean characters per line (some cues get one over-long line)
+    typo_rate    fraction of words misspelled
+    sdh_rate     fraction of cues carrying an SDH tag (a quarter of them are tag-only)
+    """
+    rng = random.Random(seed)
+    end = 0
+    for num in range(1, cues + 1):
+        if rng.random() < overlap:
+            start = max(0, end - rng.randint(50, 800))
+        else:
+            start = end + rng.randint(0, 2000)
+        end = start + rng.randint(400, 6000)
+
+        if rng.random() < 0.15:
+            lines = [synthetic_line(rng, line_length * 2, typo_rate)]
+        else:
+            lines = [synthetic_line(rng, line_length, typo_rate) for _ in range(rng.choice((1, 1, 2)))]
+        if rng.random() < sdh_rate:
+            tag = rng.choice(SDH_TAGS)
+            if rng.random() < 0.25:
+                lines = [tag]
+            else:
+                lines[0] = f"{tag} {lines[0]}"
+        yield Cue(num, start, end, '\n'.join(lines))
+
+def generate_srt(output_file, cues=10000, overlap=0.05, line_length=36, typo_rate=0.02, sdh_rate=0.05, seed=0):
+    """Write a synthetic SRT file (streamed, so 1M cues is fine). Returns the cue count."""
+    return write_srt(synthetic_cues(cues, overlap, line_length, typo_rate, sdh_rate, seed), output_file)
+
+# ========================
+#       BENCHMARKS
+# ========================
+def bench_parse(input_file, output_file):
+    from processors.subtitles import iter_srt
+    for _ in iter_srt(input_file):
+        pass
+
+def bench_spellcheck(input_file, output_file):
+    from processors.spellchecker import spellcheck_srt
+    spellcheck_srt(input_file, output_file)
+
+def bench_remove_sdh(input_file, output_file):
+    from processors.sdh_cleaner import remove_hi_tags
+    remove_hi_tags(input_file, output_file)
+
+def bench_text_layout(input_file, output_file):
+    from processors.subtitles import iter_srt
+    from processors.timing_editor import process_text_content
+    for cue in iter_srt(input_file):
+        process_text_content(cue.text, 43, 2)
+
+def bench_timing(input_file, output_file):
+    from processors.timing_editor import adjust_timings
+    adjust_timings(input_file, output_file)
+
+def bench_timing_columnar(input_file, output_file):
+    from processors.timing_editor import adjust_timings
+    adjust_timings(input_file, output_file, columnar=True)
+
+def bench_pipeline(input_file, output_file):
+    from config import DEFAULT_SETTINGS
+    from processors.pipeline import STAGES, run_pipeline
+    settings = copy.deepcopy(DEFAULT_SETTINGS)
+    settings['spellcheck']['cache_file'] = None  # A warm on-disk cache would skew later runs
+    run_pipeline(input_file, output_file, STAGES, settings)
+
+def bench_export(input_file, output_file):
+    from processors.formats import FORMATS, iter_subtitles, output_paths, write_subtitles
+    write_subtitles(iter_subtitles(input_file), output_paths(output_file, FORMATS))
+
+BENCHMARKS = {
+    'parse': bench_parse,
+    'spellcheck': bench_spellcheck,
+    'remove_sdh': bench_remove_sdh,
+    'text_layout': bench_text_layout,
+    'timing': bench_timing,
+    'timing_columnar': bench_timing_columnar,
+    'pipeline': bench_pipeline,
+    'export': bench_export,
+}
+
+def run_once(name, input_file, output_file, traced):
+    """One benchmark run (in a worker process). Returns (seconds, peak bytes or None)."""
+    bench = BENCHMARKS[name]
+    if traced:
+        tracemalloc.start()
+    started = time.perf_counter()
+    bench(input_file, output_file)
+    elapsed = time.perf_counter() - started
+    peak = None
+    if traced:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+def in_fresh_process(*args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+        return pool.submit(run_once, *args).result()
+
+def measure(name, input_file, cues, repeat=REPEAT):
+    """Best-of-`repeat` throughput plus one traced run for peak memory."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, 'out.srt')
+        best = min(in_fresh_process(name, input_file, output_file, False)[0] for _ in range(repeat))
+        _, peak = in_fresh_process(name, input_file, output_file, True)
+    return {'cues_per_sec': round(cues / best, 1), 'seconds': round(best, 4), 'peak_bytes': peak}
+
+def compare(result, baseline, threshold):
+    """Regression messages for one benchmark (empty if within threshold)."""
+    problems = []
+    if result['cues_per_sec'] < baseline['cues_per_sec'] * (1 - threshold):
+        problems.append(f"throughput {baseline['cues_per_sec']:,.0f} -> {result['cues_per_sec']:,.0f} cues/s")
+    grown = result['peak_bytes'] - baseline['peak_bytes']
+    if grown > MEMORY_SLACK and result['peak_bytes'] > baseline['peak_bytes'] * (1 + threshold):
+        problems.append(f"peak memory {baseline['peak_bytes'] / 1e6:.1f} -> {result['peak_bytes'] / 1e6:.1f} MB")
+    return problems
+
+def load_baselines(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def run_suite(args):
+    names = [name.strip() for name in args.only.split(',')] if args.only else list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    corpus = Path(tempfile.gettempdir()) / f"subfix_bench_{args.cues}_{args.seed}.srt"
+    if not corpus.exists():
+        print(f"Generating {args.cues} cues -> {corpus}")
+        generate_srt(corpus, cues=args.cues, seed=args.seed)
+
+    baselines = load_baselines(args.baseline)
+    regressions = []
+    print(f"{'benchmark':<16} {'cues/s':>12} {'peak MB':>9} {'baseline':>12} {'change':>8}")
+    for name in names:
+        key = f"{name}@{args.cues}"
+        result = measure(name, str(corpus), args.cues, args.repeat)
+        baseline = baselines.get(key)
+        change = ''
+        if baseline:
+            change = f"{(result['cues_per_sec'] / baseline['cues_per_sec'] - 1) * 100:+.1f}%"
+            problems = compare(result, baseline, args.threshold)
+            regressions.extend(f"{key}: {problem}" for problem in problems)
+        print(f"{name:<16} {result['cues_per_sec']:>12,.0f} {result['peak_bytes'] / 1e6:>9.1f} "
+              f"{baseline['cues_per_sec'] if baseline else 0:>12,.0f} {change:>8}")
+        if args.save_baseline:
+            baselines[key] = result
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+            f.write('\n')
+        print(f"Baselines saved to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"\nRegressions (threshold {args.threshold:.0%}):", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        return 1
+    return 0
+
+IMPORT_PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+print(','.join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+def measure_import(module, repeat=REPEAT):
+    """Best-of-`repeat` import time of `module` in a fresh interpreter, plus
+    the heavy modules it loaded."""
+    best, loaded = None, ''
+    for _ in range(repeat):
+        probe = IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+        output = subprocess.run([sys.executable, '-c', probe], cwd=Path(__file__).parent,
+                                capture_output=True, text=True, check=True).stdout.split('\n')
+        seconds = float(output[0])
+        best = seconds if best is None else min(best, seconds)
+        loaded = output[1]
+    return best, loaded
+
+def run_startup(args):
+    failures = []
+    print(f"{'module':<24} {'import s':>9} {'budget':>8}  heavy modules loaded")
+    for module, budget in IMPORT_BUDGET.items():
+        seconds, loaded = measure_import(module, args.repeat)
+        print(f"{module:<24} {seconds:>9.3f} {budget:>8.3f}  {loaded or '-'}")
+        if seconds > budget:
+            failures.append(f"{module}: imports in {seconds:.3f}s (budget {budget:.3f}s)")
+        if loaded:
+            failures.append(f"{module}: loads {loaded} at import time")
+
+    if failures:
+        print("\nStartup budget exceeded:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        return 1
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmark', description="Generate test subtitles and benchmark the processors.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help="write a synthetic SRT file")
+    generate.add_argument('output')
+    generate.add_argument('--cues', type=int, default=10000, help="number of cues (default: 10000)")
+    generate.add_argument('--overlap', type=float, default=0.05, help="fraction of overlapping cues (default: 0.05)")
+    generate.add_argument('--line-length', type=int, default=36, help="mean characters per line (default: 36)")
+    generate.add_argument('--typos', type=float, default=0.02, help="fraction of misspelled words (default: 0.02)")
+    generate.add_argument('--sdh', type=float, default=0.05, help="fraction of cues with SDH tags (default: 0.05)")
+    generate.add_argument('--seed', type=int, default=0)
+
+    run = commands.add_parser('run', help="run the benchmarks and compare against baselines")
+    run.add_argument('--cues', type=int, default=20000, help="corpus size (default: 20000)")
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--only', help=f"comma-separated benchmarks ({','.join(BENCHMARKS)})")
+    run.add_argument('--repeat', type=int, default=REPEAT, help=f"timed runs per benchmark (default: {REPEAT})")
+    run.add_argument('--threshold', type=float, default=THRESHOLD,
+                     help=f"allowed regression as a fraction (default: {THRESHOLD})")
+    run.add_argument('--baseline', default=str(BASELINE_FILE), help="baselines JSON file")
+    run.add_argument('--save-baseline', action='store_true', help="store this run's results as the new baselines")
+
+    startup = commands.add_parser('startup', help="check entry point import times and lazy loading")
+    startup.add_argument('--repeat', type=int, default=REPEAT, help=f"imports per module (default: {REPEAT})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'generate':
+        count = generate_srt(args.output, args.cues, args.overlap, args.line_length, args.typos, args.sdh, args.seed)
+        print(f"Wrote {count} cues to {args.output}")
+        return 0
+    if args.command == 'startup':
+        return run_startup(args)
+    return run_suite(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import copy
+import json
+
+# ========================
+#      CONFIGURATION
+# ========================
+SETTINGS_FILE = 'settings.json'
+
+DEFAULT_SETTINGS = {
+    "theme": "DarkBlue3",
+    "translation": {
+        "target_lang": "es"  # Commented out translation settings
+    },
+    "timing": {
+        "min_duration": 0.6,
+        "max_duration": 8.0,
+        "gap_between": 0.066,
+        "chars_per_sec": 25
+    },
+    "formatting": {
+        "chars_per_line": 43,
+        "max_lines": 2
+    },
+    "sdh": {  # Which hearing-impaired annotations "Remove SDH" strips
+        "brackets": True,
+        "parentheses": True,
+        "speaker_labels": True,
+        "music": True,
+        "words": None,  # Tags stripped from brackets/parentheses (regex fragments); None for the built-in HI list
+        "any_tag": False  # Strip whatever brackets/parentheses hold (removes parenthesised dialogue too)
+    },
+    "spellcheck": {
+        "cache_file": "~/.cache/subfix/spell_cache.db"  # Corrections reused across runs and shared by parallel workers (None to disable)
+    },
+    "output": {
+        "formats": ["srt"]  # Any of "srt", "vtt", "ttml"; all are written in the same pass
+    },
+    "watch": {  # subfix.py --watch
+        "stages": ["spellcheck", "remove_sdh", "adjust_timings"],
+        "settle_seconds": 2.0,  # Quiet time before a dropped file is processed
+        "poll_seconds": 2.0  # Rescan interval when polling
+    }
+}
+
+def load_settings(path=SETTINGS_FILE):
+    """Load settings.json on top of the defaults (missing keys keep their default)."""
+    settings = copy.deepcopy(DEFAULT_SETTINGS)
+    try:
+        with open(path, 'r') as f:
+            saved = json.load(f)
+    except:
+        return settings
+
+    for key, value in saved.items():
+        if isinstance(value, dict) and isinstance(settings.get(key), dict):
+            settings[key].update(value)
+        else:
+            settings[key] = value
+    return settings
+
+def save_settings(settings, path=SETTINGS_FILE):
+    with open(path, 'w') as f:
+        json.dump(settings, f)
@@ -0,0 +1,199 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .translator import join_segments, split_segments, translated_result, MAX_CHARS_PER_REQUEST
+
+# ======= CONFIGURATION =======
+CONCURRENCY = 8  # Requests in flight at once, across all providers
+RATE_LIMITS = {  # Requests per second per provider
+    'google': 5.0,
+    'microsoft': 10.0,
+    'libre': 1.0
+}
+DEFAULT_RATE = 1.0  # For providers missing from RATE_LIMITS
+BURST = 3  # Requests a provider may send back to back
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 1.0  # Seconds, doubled per attempt
+BACKOFF_MAX = 30.0
+# =============================
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` requests per second, bursting to `capacity`"""
+
+    def __init__(self, rate, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class AsyncTranslationEngine:
+    """Runs a SubtitleTranslator's providers from asyncio.
+
+    Each provider gets its own token bucket, so one slow or throttled
+    provider never holds back requests to the others. Backoff waits are
+    `asyncio.sleep`s and don't tie up a worker thread. The blocking
+    provider calls themselves run on a thread pool sized to `concurrency`.
+    """
+
+    def __init__(self, translator, concurrency=CONCURRENCY, rate_limits=None):
+        self.translator = translator
+        self.concurrency = concurrency
+        rate_limits = rate_limits or RATE_LIMITS
+        self.buckets = {
+            translator._provider_name(provider): TokenBucket(
+                rate_limits.get(translator._provider_name(provider), DEFAULT_RATE))
+            for provider in translator.provider_order
+        }
+        self._executor = None
+        self._semaphore = None
+
+    async def call_providers(self, text, source_lang, target_lang, batch=False):
+        """Async counterpart of SubtitleTranslator._call_providers"""
+        loop = asyncio.get_running_loop()
+        translator = self.translator
+        attempt = 0
+        while attempt < MAX_ATTEMPTS:
+            translator._rotate_proxy()
+            tried = False
+            for name, provider in translator.ranked_providers():
+                if not translator.health.allow(name):  # Circuit open - skip without a request
+                    continue
+                tried = True
+                await self.buckets[name].acquire()
+                async with self._semaphore:
+                    result = await loop.run_in_executor(
+                        self._executor, translator._call_tracked,
+                        name, provider, text, source_lang, target_lang, batch)
+                if result:
+                    return result, name
+            if not tried:  # Every breaker is open: wait for one to allow a trial
+                await asyncio.sleep(translator.health.retry_in(translator.provider_names()))
+                continue
+            delay = backoff_delay(attempt)
+            attempt += 1
+            print(f"⚠️ All providers failed on attempt {attempt}. Retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+        return None, None
+
+    async def translate_text(self, text, target_lang, source_lang):
+        translated = await self.try_translate_text(text, target_lang, source_lang)
+        return text if translated is None else translated  # Return original as fallback
+
+    async def try_translate_text(self, text, target_lang, source_lang, recall=True):
+        """Async counterpart of SubtitleTranslator.try_translate_text (None if every provider failed)"""
+        translator = self.translator
+        if not text.strip():
+            return text
+
+        if len(text) > MAX_CHARS_PER_REQUEST:
+            chunks = [text[i:i+MAX_CHARS_PER_REQUEST] for i in range(0, len(text), MAX_CHARS_PER_REQUEST)]
+            parts = await asyncio.gather(*(self.try_translate_text(chunk, target_lang, source_lang, recall)
+                                           for chunk in chunks))
+            return None if None in parts else ' '.join(parts)
+
+        cached = translator._recall(text, source_lang, target_lang) if recall else None
+        if cached is not None:
+            return cached
+
+        result, provider_name = await self.call_providers(text, source_lang, target_lang)
+        if result:
+            translator._remember(text, source_lang, target_lang, provider_name, result)
+            return result
+
+        translator.failed_count += 1
+        print(f"⚠️ Failed to translate: {text[:50]}...")
+        return None
+
+    async def translate_pack(self, pack, target_lang, source_lang):
+        """Async counterpart of SubtitleTranslator.process_batch"""
+        translator = self.translator
+        translations = [translator._recall(sub['text'], source_lang, target_lang) for sub in pack]
+        missing = [i for i, translated in enumerate(translations) if translated is None]
+
+        if len(missing) > 1:
+            joined = join_segments([pack[i]['text'] for i in missing])
+            result, provider_name = await self.call_providers(joined, source_lang, target_lang, batch=True)
+            segments = split_segments(result, len(missing)) if result else None
+            if segments:
+                for i, segment in zip(missing, segments):
+                    translations[i] = segment
+                    translator._remember(pack[i]['text'], source_lang, target_lang, provider_name, segment)
+            else:
+                print(f"⚠️ Batch of {len(missing)} subtitles did not align, translating one by one...")
+
+        missing = [i for i, translated in enumerate(translations) if translated is None]
+        fallbacks = await asyncio.gather(*(
+            self.try_translate_text(pack[i]['text'], target_lang, source_lang, recall=False)  # Already misses
+            for i in missing))
+        failed = set()
+        for i, translated in zip(missing, fallbacks):
+            if translated is None:
+                failed.add(i)
+                translated = pack[i]['text']  # Keep the original text
+            translations[i] = translated
+
+        translator.translated_count += len(pack) - len(failed)
+        return [translated_result(sub, translated, failed=i in failed)
+                for i, (sub, translated) in enumerate(zip(pack, translations))]
+
+    async def translate_jobs(self, jobs, source_lang, on_results=None):
+        """Translate (target_lang, pack) jobs concurrently.
+
+        Jobs for different target languages share this engine's token
+        buckets, so fanning out to many languages never exceeds a
+        provider's rate limit. `on_results(target_lang, pack, results)` is
+        called as each job finishes (in completion order, on the event loop
+        thread). A job that raises still reports its pack, every subtitle
+        failed with its original text, so callers see it as untranslated.
+        """
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            async def run_job(target_lang, pack):
+                try:
+                    return target_lang, pack, await self.translate_pack(pack, target_lang, source_lang)
+                except Exception as e:
+                    print(f"⚠️ Failed to process batch: {str(e)}")
+                    self.translator.failed_count += len(pack)
+                    return target_lang, pack, [translated_result(sub, sub['text'], failed=True) for sub in pack]
+
+            tasks = [asyncio.ensure_future(run_job(target_lang, pack)) for target_lang, pack in jobs]
+            for finished in asyncio.as_completed(tasks):
+                target_lang, pack, results = await finished
+                if on_results:
+                    on_results(target_lang, pack, results)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def translate_packs(self, packs, target_lang, source_lang, on_results=None):
+        """Translate every pack into one language; `on_results(pack, results)`"""
+        callback = (lambda _lang, pack, results: on_results(pack, results)) if on_results else None
+        await self.translate_jobs([(target_lang, pack) for pack in packs], source_lang, callback)
+
+    def run(self, packs, target_lang, source_lang, on_results=None):
+        """Blocking entry point: translate packs on a fresh event loop"""
+        asyncio.run(self.translate_packs(packs, target_lang, source_lang, on_results))
+
+    def run_jobs(self, jobs, source_lang, on_results=None):
+        """Blocking entry point for translate_jobs"""
+        asyncio.run(self.translate_jobs(jobs, source_lang, on_results))
@@ -0,0 +1,166 @@
+import csv
+import json
+from .subtitles import with_next, format_timecode
+from .formats import iter_subtitles
+from .timing_editor import to_ms, reading_chars, required_duration_ms
+
+# ======= CONFIGURATION =======
+MAX_REPORTED = 1000  # Violations kept per file; the counts always cover every cue
+# =============================
+
+RULES = ('min_duration', 'max_duration', 'reading_speed', 'overlap', 'min_gap', 'line_length', 'max_lines')
+
+
+class Violation:
+    """One rule broken by one cue."""
+    __slots__ = ('num', 'start', 'end', 'rule', 'value', 'limit')
+
+    def __init__(self, num, start, end, rule, value, limit):
+        self.num = num
+        self.start = start
+        self.end = end
+        self.rule = rule
+        self.value = value
+        self.limit = limit
+
+    def to_dict(self):
+        return {
+            'cue': self.num,
+            'start': format_timecode(self.start),
+            'end': format_timecode(self.end),
+            'rule': self.rule,
+            'value': self.value,
+            'limit': self.limit
+        }
+
+
+class ComplianceRules:
+    """The limits adjust_timings enforces, read from the settings schema
+    ("timing" and "formatting" blocks), as checks that change nothing.
+
+    Reading time comes from required_duration_ms, as in retime_cue, so a
+    cue the fixer extended is never flagged. adjust_timings output can
+    still break two rules, by design:
+
+    - reading_speed, when reading time exceeds max_duration or the cue is
+      trimmed to keep min_gap before the next one (cues are only pushed
+      later to make room for min_duration, never for reading time)
+    - line_length, when the text does not fit in max_lines lines of
+      chars_per_line; the fixer rewraps text but never drops or splits words
+    """
+
+    def __init__(self, settings):
+        timing = settings["timing"]
+        formatting = settings["formatting"]
+        self.min_duration_ms = to_ms(timing["min_duration"])
+        self.max_duration_ms = to_ms(timing["max_duration"])
+        self.min_gap_ms = to_ms(timing["gap_between"])
+        self.chars_per_sec = timing["chars_per_sec"]
+        self.chars_per_line = formatting["chars_per_line"]
+        self.max_lines = formatting["max_lines"]
+
+    def check(self, cue, next_cue):
+        """Yield every Violation for `cue` (next_cue is None for the last one)."""
+        duration = cue.end - cue.start
+        if duration < self.min_duration_ms:
+            yield Violation(cue.num, cue.start, cue.end, 'min_duration', duration, self.min_duration_ms)
+        if self.max_duration_ms > 0 and duration > self.max_duration_ms:
+            yield Violation(cue.num, cue.start, cue.end, 'max_duration', duration, self.max_duration_ms)
+
+        if self.chars_per_sec > 0:
+            chars = reading_chars(cue.text)
+            if chars and duration < required_duration_ms(cue.text, 0, self.chars_per_sec):
+                speed = round(chars * 1000 / duration, 1) if duration > 0 else None
+                yield Violation(cue.num, cue.start, cue.end, 'reading_speed', speed, self.chars_per_sec)
+
+        if next_cue is not None:
+            gap = next_cue.start - cue.end
+            if gap < 0:
+                yield Violation(cue.num, cue.start, cue.end, 'overlap', -gap, 0)
+            elif gap < self.min_gap_ms:
+                yield Violation(cue.num, cue.start, cue.end, 'min_gap', gap, self.min_gap_ms)
+
+        lines = cue.text.split('\n')
+        if len(lines) > self.max_lines:
+            yield Violation(cue.num, cue.start, cue.end, 'max_lines', len(lines), self.max_lines)
+        longest = max(map(len, lines))
+        if longest > self.chars_per_line:
+            yield Violation(cue.num, cue.start, cue.end, 'line_length', longest, self.chars_per_line)
+
+
+def lint_file(input_file, settings, max_reported=MAX_REPORTED):
+    """Check every cue of an SRT or WebVTT file. Never raises; returns a summary dict.
+
+    The file is streamed and never written. `violations` holds the first
+    `max_reported` violations, `counts` the per-rule totals.
+    """
+    rules = ComplianceRules(settings)
+    counts = dict.fromkeys(RULES, 0)
+    violations = []
+    cues = 0
+    bad_cues = 0
+    try:
+        for cue, next_cue in with_next(iter_subtitles(input_file)):
+            cues += 1
+            found = False
+            for violation in rules.check(cue, next_cue):
+                found = True
+                counts[violation.rule] += 1
+                if len(violations) < max_reported:
+                    violations.append(violation.to_dict())
+            bad_cues += found
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    return {
+        'file': str(input_file),
+        'cues': cues,
+        'cues_with_violations': bad_cues,
+        'violations': sum(counts.values()),
+        'counts': counts,
+        'details': violations,
+        'error': error
+    }
+
+def _lint_job(job):
+    return lint_file(*job)
+
+def lint_files(input_files, settings, workers=1, max_reported=MAX_REPORTED):
+    """Lint many files, in parallel when workers > 1. Yields summaries in input order."""
+    jobs = [(str(input_file), settings, max_reported) for input_file in input_files]
+    if workers <= 1 or len(jobs) <= 1:
+        yield from map(_lint_job, jobs)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        yield from pool.map(_lint_job, jobs, chunksize=max(1, len(jobs) // (workers * 8)))
+
+def write_lint_json(results, output_file):
+    """Full report: per-file summaries with their violations, plus catalog totals."""
+    totals = dict.fromkeys(RULES, 0)
+    for result in results:
+        for rule, count in result['counts'].items():
+            totals[rule] += count
+    report = {
+        'files': len(results),
+        'files_with_violations': sum(1 for result in results if result['violations']),
+        'files_failed': sum(1 for result in results if result['error']),
+        'totals': totals,
+        'results': results
+    }
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1, ensure_ascii=False)
+        f.write('\n')
+
+def write_lint_csv(results, output_file):
+    """One row per violation (file, cue, times, rule, value, limit)."""
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['file', 'cue', 'start', 'end', 'rule', 'value', 'limit'])
+        for result in results:
+            if result['error']:
+                writer.writerow([result['file'], '', '', '', 'error', result['error'], ''])
+            for violation in result['details']:
+                writer.writerow([result['file'], violation['cue'], violation['start'], violation['end'],
+                                 violation['rule'], violation['value'], violation['limit']])
@@ -0,0 +1,161 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# ======= CONFIGURATION =======
+MAX_MEMORY_ENTRIES = 50000  # Words kept in the in-memory LRU
+MAX_DISK_BYTES = 64 * 1024 * 1024  # On-disk store is trimmed above this size
+WRITE_BATCH = 256  # New corrections / hits buffered before a (short) write transaction
+BUSY_TIMEOUT = 30.0  # Seconds to wait for another process holding the write lock
+# =============================
+
+MISSING = object()  # Distinguishes "not cached" from a cached None correction
+
+
+class CorrectionCache:
+    """Word -> correction cache shared across files.
+
+    Entries live in an in-memory LRU and, if `path` is given, in a SQLite
+    file that survives between runs. Everything is keyed by language and
+    dictionary version so a dictionary upgrade never serves stale results.
+
+    Several processes can share one file: it runs in WAL mode, and new
+    entries and last-used times of hits are written in batches of
+    WRITE_BATCH, each in its own short transaction, so the write lock is
+    never held for long. A store that stays locked only costs cache
+    writes, never a failed file.
+    """
+
+    def __init__(self, language='en', dictionary_version='', path=None,
+                 max_entries=MAX_MEMORY_ENTRIES, max_disk_bytes=MAX_DISK_BYTES):
+        self.namespace = f"{language}:{dictionary_version}"
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._pending = {}  # Word -> correction not yet written to disk
+        self._touched = set()  # Words read from disk whose last_used is not yet updated
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._open_db(Path(path).expanduser())
+
+    def _open_db(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS corrections ("
+            " namespace TEXT, word TEXT, correction TEXT, last_used REAL,"
+            " PRIMARY KEY (namespace, word))"
+        )
+        self._db.commit()
+
+    def get(self, word):
+        """Return the cached correction (may be None) or MISSING."""
+        with self._lock:
+            if word in self._memory:
+                self._memory.move_to_end(word)
+                self.hits += 1
+                return self._memory[word]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT correction FROM corrections WHERE namespace = ? AND word = ?",
+                    (self.namespace, word)
+                ).fetchone()
+                if row is not None:
+                    self._remember(word, row[0])
+                    self._touched.add(word)
+                    self._write_if_due()
+                    self.hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return MISSING
+
+    def put(self, word, correction):
+        with self._lock:
+            self._remember(word, correction)
+            if self._db is not None:
+                self._pending[word] = correction
+                self._touched.discard(word)
+                self._write_if_due()
+
+    def _remember(self, word, correction):
+        self._memory[word] = correction
+        self._memory.move_to_end(word)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _write_if_due(self):
+        if len(self._pending) + len(self._touched) >= WRITE_BATCH:
+            self._write()
+
+    def _write(self):
+        """Write buffered entries and hit times in one short transaction (lock held)."""
+        if not self._pending and not self._touched:
+            return
+        now = time.time()
+        try:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO corrections VALUES (?, ?, ?, ?)",
+                    [(self.namespace, word, correction, now) for word, correction in self._pending.items()]
+                )
+                self._db.executemany(
+                    "UPDATE corrections SET last_used = ? WHERE namespace = ? AND word = ?",
+                    [(now, self.namespace, word) for word in self._touched]
+                )
+        except sqlite3.OperationalError as e:  # Still locked after BUSY_TIMEOUT: keep the batch for later
+            print(f"⚠️ Correction cache busy, will retry: {e}")
+            return
+        self._pending.clear()
+        self._touched.clear()
+
+    def flush(self):
+        """Write pending entries and trim the store to max_disk_bytes."""
+        if self._db is None:
+            return
+        with self._lock:
+            self._write()
+            try:
+                self._evict()
+            except sqlite3.OperationalError as e:
+                print(f"⚠️ Correction cache not trimmed: {e}")
+
+    def _evict(self):
+        page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        pages = self._db.execute("PRAGMA page_count").fetchone()[0]
+        if page_size * pages <= self.max_disk_bytes:
+            return
+
+        # Drop the least recently used half, then reclaim the space
+        total = self._db.execute("SELECT COUNT(*) FROM corrections").fetchone()[0]
+        self._db.execute(
+            "DELETE FROM corrections WHERE rowid IN ("
+            " SELECT rowid FROM corrections ORDER BY last_used LIMIT ?)",
+            (total // 2,)
+        )
+        self._db.commit()
+        self._db.execute("VACUUM")
+
+    def close(self):
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+_shared_caches = {}
+
+def get_cache(language='en', dictionary_version='', path=None):
+    """Return the process-wide cache for this language/dictionary/path."""
+    key = (language, dictionary_version, str(path) if path else None)
+    if key not in _shared_caches:
+        _shared_caches[key] = CorrectionCache(language, dictionary_version, path)
+    return _shared_caches[key]
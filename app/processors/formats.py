@@ -0,0 +1,204 @@
+import html
+import os
+import re
+from contextlib import ExitStack
+from pathlib import Path
+from .subtitles import Cue, format_cue, format_timecode, iter_srt
+
+# ======= CONFIGURATION =======
+BUFFER_CUES = 500  # Cues formatted before each bulk write
+# =============================
+
+READ_EXTENSIONS = ('.srt', '.vtt')
+VTT_DROPPED_TAGS = re.compile(r'</?(?:c|v|lang|ruby|rt)(?:[.\s][^>]*)?>|<\d[\d:.]*>')  # Styling SRT can't hold
+TAG = re.compile(r'<(/?)([a-zA-Z]+)[^>]*>')
+TTML_STYLES = {
+    'i': 'tts:fontStyle="italic"',
+    'b': 'tts:fontWeight="bold"',
+    'u': 'tts:textDecoration="underline"'
+}
+TTML_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<tt xmlns="http://www.w3.org/ns/ttml" xmlns:tts="http://www.w3.org/ns/ttml#styling" xml:lang="">\n'
+    '  <body>\n'
+    '    <div>\n'
+)
+TTML_FOOTER = '    </div>\n  </body>\n</tt>\n'
+
+
+class SubtitleFormat:
+    """How one output format is written: a header, one string per cue and a footer."""
+    __slots__ = ('name', 'extension', 'header', 'format_cue', 'footer')
+
+    def __init__(self, name, extension, header, format_cue, footer):
+        self.name = name
+        self.extension = extension
+        self.header = header
+        self.format_cue = format_cue
+        self.footer = footer
+
+
+def vtt_timecode(ms):
+    """Format integer milliseconds as a WebVTT timestamp (HH:MM:SS.mmm)."""
+    return format_timecode(ms).replace(',', '.')
+
+def parse_vtt_timecode(timecode):
+    """Parse a WebVTT timestamp ([HH:]MM:SS.mmm, hours may be omitted or longer) into ms.
+
+    Raises ValueError on malformed input.
+    """
+    parts = timecode.strip().split(':')
+    seconds, dot, millis = parts[-1].partition('.')
+    if len(parts) not in (2, 3) or not dot or len(millis) != 3 or len(seconds) != 2:
+        raise ValueError(f"Invalid timecode: {timecode!r}")
+    hours = int(parts[0]) if len(parts) == 3 else 0
+    return hours * 3600000 + int(parts[-2]) * 60000 + int(seconds) * 1000 + int(millis)
+
+def format_vtt_cue(cue):
+    """A WebVTT cue block. Tags WebVTT doesn't have (e.g. <font>) are dropped."""
+    text = _markup(cue.text, _vtt_tag)  # Escaping also keeps "-->" out of the text
+    return f"{cue.num}\n{vtt_timecode(cue.start)} --> {vtt_timecode(cue.end)}\n{text}\n\n"
+
+def format_ttml_cue(cue):
+    """A TTML <p>; <i>, <b> and <u> become styled spans, lines <br/>."""
+    text = _markup(cue.text, _ttml_tag).replace('\n', '<br/>')
+    return f'      <p begin="{vtt_timecode(cue.start)}" end="{vtt_timecode(cue.end)}">{text}</p>\n'
+
+def _vtt_tag(name, closing):
+    return f"<{'/' if closing else ''}{name}>"
+
+def _ttml_tag(name, closing):
+    return '</span>' if closing else f'<span {TTML_STYLES[name]}>'
+
+def _markup(text, render_tag):
+    """Escape text for a markup format, keeping only balanced <i>/<b>/<u> tags."""
+    if '<' not in text and '&' not in text and '>' not in text:
+        return text  # Most cues: nothing to escape
+    out = []
+    open_tags = []
+    position = 0
+    for match in TAG.finditer(text):
+        out.append(html.escape(text[position:match.start()], quote=False))
+        position = match.end()
+        closing, name = match.group(1) == '/', match.group(2).lower()
+        if name not in TTML_STYLES:
+            continue
+        if not closing:
+            open_tags.append(name)
+            out.append(render_tag(name, False))
+        elif name in open_tags:  # Close everything opened inside it too
+            while open_tags:
+                inner = open_tags.pop()
+                out.append(render_tag(inner, True))
+                if inner == name:
+                    break
+    out.append(html.escape(text[position:], quote=False))
+    while open_tags:
+        out.append(render_tag(open_tags.pop(), True))
+    return ''.join(out)
+
+
+FORMATS = {
+    'srt': SubtitleFormat('srt', '.srt', '', format_cue, ''),
+    'vtt': SubtitleFormat('vtt', '.vtt', 'WEBVTT\n\n', format_vtt_cue, ''),
+    'ttml': SubtitleFormat('ttml', '.ttml', TTML_HEADER, format_ttml_cue, TTML_FOOTER)
+}
+EXTENSIONS = {'.srt': 'srt', '.vtt': 'vtt', '.ttml': 'ttml', '.dfxp': 'ttml', '.xml': 'ttml'}
+
+
+def format_for(path):
+    """Format name for an output path, from its extension (SRT if unknown)."""
+    return EXTENSIONS.get(Path(path).suffix.lower(), 'srt')
+
+def output_paths(base_path, formats):
+    """{format: path} for writing base_path in each format (its extension swapped)."""
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown subtitle format(s): {', '.join(sorted(unknown))}")
+    base_path = Path(base_path)
+    return {name: base_path.with_suffix(FORMATS[name].extension) for name in formats}
+
+def write_subtitles(cues, outputs, buffer_cues=BUFFER_CUES):
+    """Write cues to one or more formats in a single pass.
+
+    `outputs` is a path (format from its extension) or a {format: path}
+    mapping. Every cue is formatted once per format as it arrives and the
+    text is written in bulk every `buffer_cues` cues, so a generator is
+    never materialised. Each output goes to a hidden temp file next to it
+    and only replaces the real path once every cue is written, so a
+    failure never leaves an empty or truncated file behind.
+    Returns the number of cues written.
+    """
+    if not isinstance(outputs, dict):
+        outputs = {format_for(outputs): outputs}
+    formats = [FORMATS[name] for name in outputs]
+    paths = [Path(path) for path in outputs.values()]
+    temps = [path.with_name(f'.{path.name}.{os.getpid()}.tmp') for path in paths]
+    count = 0
+    try:
+        with ExitStack() as stack:
+            files = [stack.enter_context(open(temp, 'w', encoding='utf-8')) for temp in temps]
+            writers = [(fmt.format_cue, [fmt.header], f) for fmt, f in zip(formats, files)]
+            for cue in cues:
+                for render, buffer, f in writers:
+                    buffer.append(render(cue))
+                count += 1
+                if count % buffer_cues == 0:
+                    for _, buffer, f in writers:
+                        f.write(''.join(buffer))
+                        buffer.clear()
+            for fmt, (_, buffer, f) in zip(formats, writers):
+                buffer.append(fmt.footer)
+                f.write(''.join(buffer))
+        for temp, path in zip(temps, paths):
+            os.replace(temp, path)
+    except BaseException:
+        for temp in temps:
+            temp.unlink(missing_ok=True)
+        raise
+    return count
+
+def parse_vtt_block(lines, num):
+    """Parse one WebVTT block (a list of lines) into a Cue, or None for
+    headers, NOTE/STYLE/REGION blocks and malformed cues."""
+    timing = 1 if len(lines) > 1 and '-->' not in lines[0] else 0  # Skip the optional cue identifier
+    start_str, arrow, rest = lines[timing].partition('-->')
+    if not arrow or not rest.split():
+        return None
+    try:
+        start = parse_vtt_timecode(start_str)
+        end = parse_vtt_timecode(rest.split()[0])  # Cue settings may follow
+    except ValueError:
+        return None
+    text = '\n'.join(line.strip() for line in lines[timing + 1:])
+    return Cue(str(num), start, end, html.unescape(VTT_DROPPED_TAGS.sub('', text)))
+
+def iter_vtt(input_file):
+    """Yield cues from a WebVTT file one at a time, reading line by line.
+
+    Voice, class and inline timestamp tags are dropped, entities decoded;
+    cues are numbered from 1 whatever their identifiers.
+    """
+    with open(input_file, 'r', encoding='utf-8-sig') as f:
+        num = 0
+        block = []
+        for line in f:
+            if line.strip():
+                block.append(line.rstrip('\r\n'))
+                continue
+            if block:
+                cue = parse_vtt_block(block, num + 1)
+                if cue is not None:
+                    num += 1
+                    yield cue
+                block = []
+        if block:
+            cue = parse_vtt_block(block, num + 1)
+            if cue is not None:
+                yield cue
+
+def iter_subtitles(input_file):
+    """Yield cues from an SRT or WebVTT file (chosen by extension)."""
+    if Path(input_file).suffix.lower() == '.vtt':
+        return iter_vtt(input_file)
+    return iter_srt(input_file)
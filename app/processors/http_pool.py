@@ -0,0 +1,57 @@
+import threading
+
+# ======= CONFIGURATION =======
+POOL_SIZE = 10  # Keep-alive connections kept per host, per thread
+# =============================
+
+
+class PooledRequests:
+    """Drop-in for the `requests` module that sends through pooled Sessions.
+
+    deep_translator calls `requests.get`/`requests.post` directly, which
+    opens a fresh connection (and TLS handshake) for every cue. Installing
+    this in its provider modules routes those calls through one keep-alive
+    Session per thread instead. Everything else is forwarded to `requests`.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE):
+        self.pool_size = pool_size
+        self._local = threading.local()
+
+    def session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+    def get(self, url, **kwargs):
+        return self.session().get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.session().post(url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        return self.session().request(method, url, **kwargs)
+
+    def __getattr__(self, name):
+        import requests
+        return getattr(requests, name)
+
+
+_installed = None
+
+def install(pool_size=POOL_SIZE):
+    """Route deep_translator's provider modules through pooled sessions."""
+    global _installed
+    if _installed is None or _installed.pool_size != pool_size:
+        from deep_translator import google, microsoft, libre
+        _installed = PooledRequests(pool_size)
+        for module in (google, microsoft, libre):
+            module.requests = _installed
+    return _installed
@@ -0,0 +1,143 @@
+import json
+import time
+
+# Hook API: every hook is called as hook(event, data) in the process doing the work.
+#   "file"        data = FileStats.to_dict() after run_pipeline finishes a file
+#   "translation" data = stats dict after translate_srt_multi finishes
+#   "run"         data = the whole report, when a batch writes one
+_hooks = []
+
+def add_hook(hook):
+    _hooks.append(hook)
+
+def remove_hook(hook):
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+def emit(event, data):
+    for hook in list(_hooks):
+        try:
+            hook(event, data)
+        except Exception as e:  # A broken hook must never fail the run
+            print(f"⚠️ Instrumentation hook failed on {event}: {e}")
+
+
+class StageStats:
+    """Time and cue counts for one stage of one file.
+
+    `seconds` is time spent in the stage itself (not upstream stages).
+    `cues_changed` counts cues the stage modified (a cue with three
+    spelling fixes counts once); words corrected are the
+    "spellcheck_corrections" counter of the file.
+    """
+    __slots__ = ('name', 'seconds', 'cues_in', 'cues_out', 'cues_changed')
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.cues_in = 0
+        self.cues_out = 0
+        self.cues_changed = 0
+
+    def to_dict(self):
+        return {
+            'seconds': round(self.seconds, 6),
+            'cues_in': self.cues_in,
+            'cues_out': self.cues_out,
+            'cues_changed': self.cues_changed,
+            'cues_per_sec': round(self.cues_in / self.seconds, 1) if self.seconds and self.cues_in else None
+        }
+
+
+class FileStats:
+    """Everything measured while processing one file."""
+
+    def __init__(self, input_file=None, output_file=None):
+        self.input_file = str(input_file) if input_file else None
+        self.output_file = str(output_file) if output_file else None
+        self.stages = {}  # Name -> StageStats, in pipeline order
+        self.counters = {}  # Extra numbers, e.g. cache hits/misses
+        self.seconds = 0.0
+        self.cues_written = 0
+        self.error = None
+
+    def stage(self, name):
+        if name not in self.stages:
+            self.stages[name] = StageStats(name)
+        return self.stages[name]
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def to_dict(self):
+        return {
+            'input': self.input_file,
+            'output': self.output_file,
+            'seconds': round(self.seconds, 6),
+            'cues_written': self.cues_written,
+            'cues_per_sec': round(self.cues_written / self.seconds, 1) if self.seconds else None,
+            'stages': {name: stage.to_dict() for name, stage in self.stages.items()},
+            'counters': dict(self.counters),
+            'error': self.error
+        }
+
+
+class IteratorClock:
+    """Wraps an iterator and accumulates the time spent producing its items.
+
+    The total includes every upstream iterator, so a stage's own time is its
+    clock minus the clock of the iterator feeding it.
+    """
+
+    def __init__(self, iterator):
+        self.iterator = iter(iterator)
+        self.seconds = 0.0
+        self.items = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            item = next(self.iterator)
+        finally:
+            self.seconds += time.perf_counter() - started
+        self.items += 1
+        return item
+
+
+def summarize(files):
+    """Totals per stage across file dicts (FileStats.to_dict() output)."""
+    totals = {}
+    for file in files:
+        for name, stage in file['stages'].items():
+            total = totals.setdefault(name, {'seconds': 0.0, 'cues_in': 0, 'cues_out': 0, 'cues_changed': 0})
+            for key in ('seconds', 'cues_in', 'cues_out', 'cues_changed'):
+                total[key] += stage[key]
+    for total in totals.values():
+        total['seconds'] = round(total['seconds'], 6)
+        total['cues_per_sec'] = (round(total['cues_in'] / total['seconds'], 1)
+                                 if total['seconds'] and total['cues_in'] else None)
+    return totals
+
+def build_report(files, **extra):
+    """A run report: per-file stats, per-stage totals and any extra fields."""
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'files': files,
+        'stage_totals': summarize(files),
+        'seconds': round(sum(file['seconds'] for file in files), 6),
+        'cues_written': sum(file['cues_written'] for file in files),
+        'failed': sum(1 for file in files if file.get('error')),
+        **extra
+    }
+
+def write_report(path, files, **extra):
+    """Write a JSON run report, emit it to the "run" hooks and return it."""
+    report = build_report(files, **extra)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    emit('run', report)
+    return report
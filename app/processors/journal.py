@@ -0,0 +1,84 @@
+import json
+import os
+from pathlib import Path
+
+# ======= CONFIGURATION =======
+SYNC_EVERY = 50  # fsync the journal after this many entries
+# =============================
+
+
+class TranslationJournal:
+    """Append-only checkpoint of translated cues.
+
+    The first line is a JSON header describing the job; every later line is
+    one finished cue, `{"i": <cue index>, "t": <translated text>}`. Nothing
+    is ever rewritten, so a crash loses at most the entries since the last
+    fsync, and a torn line is simply skipped on replay.
+    """
+
+    def __init__(self, path, header, sync_every=SYNC_EVERY):
+        self.path = Path(path)
+        self.header = header
+        self.sync_every = sync_every
+        self._unsynced = 0
+        self._file = None
+
+    def replay(self):
+        """Return {cue index: translated text} from an existing journal.
+
+        A journal written for a different job (header mismatch) is ignored.
+        """
+        entries = {}
+        if not self.path.exists():
+            return entries
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = iter(f)
+            try:
+                if json.loads(next(lines)) != self.header:
+                    return {}
+            except (StopIteration, ValueError):
+                return {}
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Torn write from an interrupted run
+                entries[entry['i']] = entry['t']
+        return entries
+
+    def open(self):
+        """Start appending, keeping any entries worth replaying."""
+        entries = self.replay()
+        self._file = open(self.path, 'w' if not entries else 'a', encoding='utf-8')
+        if not entries:
+            self._file.write(json.dumps(self.header) + '\n')
+        else:
+            # Make sure a torn last line can't swallow the next entry
+            self._file.write('\n')
+        return entries
+
+    def append(self, index, translated_text):
+        self._file.write(json.dumps({'i': index, 't': translated_text}) + '\n')
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """Close and delete the journal once the output has been written."""
+        self.close()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,161 @@
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import accumulate
+
+# ======= CONFIGURATION =======
+CACHE_SIZE = 65536  # Distinct (text, chars_per_line, max_lines) layouts kept in memory
+BREAK_SLACK = {  # Characters of imbalance worth accepting to break after these
+    '.': 10, '!': 10, '?': 10, '…': 10,
+    ';': 8, ':': 8,
+    ',': 6, '-': 4
+}
+WEAK_SLACK = 4  # Characters of imbalance worth accepting to avoid ending a line on these words
+WEAK_WORDS = frozenset((
+    'a', 'an', 'the', 'to', 'of', 'and', 'or', 'but', 'in', 'on', 'at', 'for', 'with', 'my', 'your', 'his', 'her'
+))
+# =============================
+
+MAX_BONUS = 2 * max(BREAK_SLACK.values()) ** 2
+
+
+def _break_bonus(word):
+    """Reward for ending a line after `word`"""
+    slack = BREAK_SLACK.get(word[-1], 0)
+    if slack:
+        return 2 * slack * slack
+    if word.lower() in WEAK_WORDS:
+        return -2 * WEAK_SLACK * WEAK_SLACK
+    return 0
+
+def _one_or_two_lines(words, chars_per_line):
+    """_layout for max_lines=2 without dialogue lines, the common case,
+    as a scan over the possible break points."""
+    line_cost = chars_per_line * chars_per_line
+    overflow_cost = 100 * line_cost
+    ends = list(accumulate([len(word) + 1 for word in words]))  # First line of words[:k+1] is ends[k] - 1 long
+    total = ends[-1] - 1
+
+    best = line_cost + total * total
+    if total > chars_per_line:
+        best += overflow_cost * (total - chars_per_line)
+    best_break = None
+
+    # Break points where both lines fit always beat ones that overflow, so
+    # only those are tried when there are any
+    candidates = range(bisect_left(ends, total - chars_per_line), min(bisect_right(ends, chars_per_line + 1), len(words) - 1))
+    if not candidates:
+        candidates = range(len(words) - 1)
+    for k in candidates:  # Break after words[k]
+        first = ends[k] - 1
+        second = total - first - 1
+        cost = 2 * line_cost + first * first + second * second
+        if cost - MAX_BONUS >= best:
+            continue  # Too unbalanced for any punctuation to make up for
+        cost -= _break_bonus(words[k])
+        if first > chars_per_line:
+            cost += overflow_cost * (first - chars_per_line)
+        if second > chars_per_line:
+            cost += overflow_cost * (second - chars_per_line)
+        if cost < best:
+            best, best_break = cost, k + 1
+    return [0] if best_break is None else [0, best_break]
+
+def _layout(words, dashes, chars_per_line, max_lines):
+    """Best split of `words` into at most max_lines lines.
+
+    Dynamic programming over (words placed, lines used). A line costs the
+    square of its length, so for a given line count the most balanced
+    split wins. On top of that:
+      - every line costs chars_per_line², so an extra line is only used
+        when the text doesn't fit otherwise
+      - each character past chars_per_line costs far more than a line
+      - breaking after punctuation earns a bonus (BREAK_SLACK), ending a
+        line on a weak word (WEAK_WORDS) a penalty
+      - joining two dialogue lines ("- ...") costs more than any
+        overflow, so it only happens when there are more speakers than lines
+    Returns lists of word indices where each line starts.
+    """
+    n = len(words)
+    line_cost = chars_per_line * chars_per_line
+    overflow_cost = 100 * line_cost
+    merge_cost = overflow_cost * chars_per_line  # Worse than any overflow: speakers stay apart unless lines run out
+    bonus = [_break_bonus(word) for word in words]  # Reward for ending a line after word i
+    max_bonus = max(max(bonus), 0)
+
+    # Prefix sums: a line of words[i:j] is ends[j] - ends[i] - 1 characters
+    # and swallows starts_seen[j] - starts_seen[i + 1] dialogue lines
+    ends, starts_seen = [0], [0]
+    for word, dash in zip(words, dashes):
+        ends.append(ends[-1] + len(word) + 1)
+        starts_seen.append(starts_seen[-1] + dash)
+
+    INF = float('inf')
+    # best[m][j]: cheapest layout of words[:j] in m lines; back[m][j]: where its last line starts
+    best = [[INF] * (n + 1) for _ in range(max_lines + 1)]
+    back = [[0] * (n + 1) for _ in range(max_lines + 1)]
+    best[0][0] = 0
+
+    for m in range(1, max_lines + 1):
+        previous, current, starts = best[m - 1], best[m], back[m]
+        first = m - 1  # Earliest start the previous lines can reach
+        # The last line count only needs the full text; earlier ones need every prefix
+        for j in range(m, n + 1) if m < max_lines else (n,):
+            # Last line is words[i:j]; grow it leftwards from words[j-1]
+            end_bonus = bonus[j - 1] if j < n else 0
+            for i in range(j - 1, first - 1, -1) if m > 1 else (0,):
+                length = ends[j] - ends[i] - 1
+                cost = line_cost + length * length
+                if length > chars_per_line:
+                    cost += overflow_cost * (length - chars_per_line)
+                    if cost - max_bonus > current[j]:
+                        break  # Longer lines only cost more, whatever comes before them
+                merged = starts_seen[j] - starts_seen[i + 1]
+                if merged:
+                    cost += merge_cost * merged  # This line would swallow the start of a dialogue line
+                cost += previous[i] - end_bonus
+                if cost <= current[j]:  # On ties the longer last line wins (bottom-heavy)
+                    current[j] = cost
+                    starts[j] = i
+
+    lines = min(range(1, max_lines + 1), key=lambda m: best[m][n])
+    breaks = []
+    j = n
+    for m in range(lines, 0, -1):
+        i = back[m][j]
+        breaks.append(i)
+        j = i
+    return breaks[::-1]
+
+def break_lines(text, chars_per_line, max_lines):
+    """Lay `text` out in at most max_lines lines of chars_per_line, choosing
+    break points for punctuation and balance. Text that already fits is
+    returned unchanged, and no words are ever dropped: if the text can't
+    fit, the lines overflow instead of being truncated."""
+    if len(text) <= chars_per_line and text.count('\n') < max_lines:
+        return text  # Fits (checked cheaply, never cached)
+    lines = text.split('\n')
+    if len(lines) <= max_lines and all(len(line) <= chars_per_line for line in lines):
+        return text
+    return reflow(text, chars_per_line, max_lines)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def reflow(text, chars_per_line, max_lines):
+    """The memoized layout behind break_lines, for text that doesn't fit as is."""
+    lines = text.split('\n')
+    chars_per_line, max_lines = max(chars_per_line, 1), max(max_lines, 1)
+    dialogue = any(line.lstrip().startswith('-') for line in lines[1:])
+    if max_lines == 2 and not dialogue:
+        words = text.split()
+        starts = _one_or_two_lines(words, chars_per_line) if words else []
+    else:
+        words, dashes = [], []  # dashes[i]: words[i] starts a dialogue line
+        for line in lines:
+            for k, word in enumerate(line.split()):
+                words.append(word)
+                dashes.append(k == 0 and word.startswith('-'))
+        starts = _layout(words, dashes, chars_per_line, max_lines) if words else []
+    if not words:
+        return text
+
+    ends = starts[1:] + [len(words)]
+    return '\n'.join(' '.join(words[i:j]) for i, j in zip(starts, ends))
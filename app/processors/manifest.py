@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# ======= CONFIGURATION =======
+MANIFEST_NAME = '.subfix_manifest.json'  # Kept in the output folder
+PIPELINE_VERSION = 2  # Bump when a stage's output changes for the same input and settings
+STAGE_SETTINGS = {  # Settings blocks each stage's output depends on
+    'spellcheck': (),
+    'remove_sdh': ('sdh',),
+    'adjust_timings': ('timing', 'formatting')
+}
+# =============================
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """BLAKE2b digest of a file's content"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def input_state(input_file):
+    """(content hash, size/mtime stamp) of an input, for Manifest.record.
+
+    Take it before the input is read for processing: if the file is edited
+    while it is being processed, the recorded state is the old one, so the
+    manifest sees the change and the file is processed again.
+    """
+    stamp = Manifest._stamp(input_file)  # Before hashing, so a write during it changes the stamp
+    return file_hash(input_file), stamp
+
+def run_key(stages, settings):
+    """Digest of everything besides the input that decides a file's output:
+    the stages in order and the settings blocks those stages read."""
+    relevant = {
+        'version': PIPELINE_VERSION,
+        'stages': list(stages),
+        'settings': {
+            block: settings.get(block)
+            for stage in stages for block in STAGE_SETTINGS.get(stage, ())
+        }
+    }
+    encoded = json.dumps(relevant, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+def _output_files(output_file):
+    """A path or a {format: path} mapping, as a list of paths."""
+    return list(output_file.values()) if isinstance(output_file, dict) else [output_file]
+
+
+class Manifest:
+    """Records which inputs produced which outputs, so unchanged files can be skipped.
+
+    Each input is stored with its content hash, the run key it was
+    processed with and the size/mtime of the output(s) written. An input is
+    current when all three still match. Content hashes are only recomputed
+    when an input's size or mtime changed, so checking an unchanged
+    library costs one stat() per file.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('files', {})
+        except (OSError, ValueError):
+            pass
+
+    @classmethod
+    def for_folder(cls, out_folder):
+        return cls(Path(out_folder) / MANIFEST_NAME)
+
+    @staticmethod
+    def _stamp(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    @classmethod
+    def _output_entry(cls, output_file):
+        """Resolved path(s) and stamp(s) of the output; plain values when there is one."""
+        paths = [str(Path(path).resolve()) for path in _output_files(output_file)]
+        if len(paths) == 1:
+            return paths[0], cls._stamp(paths[0])
+        return paths, [cls._stamp(path) for path in paths]
+
+    def content_hash(self, input_file):
+        """Hash of input_file, reusing the recorded one if the file wasn't touched."""
+        entry = self.entries.get(str(Path(input_file).resolve()))
+        stamp = self._stamp(input_file)
+        if entry and entry.get('input_stamp') == stamp:
+            return entry['hash']
+        return file_hash(input_file)
+
+    def is_current(self, input_file, output_file, key):
+        """Whether output_file (a path or {format: path}) already holds input_file processed with `key`."""
+        entry = self.entries.get(str(Path(input_file).resolve()))
+        if not entry or entry.get('key') != key:
+            return False
+        try:
+            if self._output_entry(output_file) != (entry.get('output'), entry.get('output_stamp')):
+                return False  # Different outputs, or one was deleted or edited since
+            if self.content_hash(input_file) != entry['hash']:
+                return False
+            stamp = self._stamp(input_file)
+            if entry.get('input_stamp') != stamp:  # Touched but identical: skip the hash next time
+                entry['input_stamp'] = stamp
+                self.dirty = True
+            return True
+        except OSError:
+            return False
+
+    def record(self, input_file, output_file, key, state):
+        """Remember a successful run (call after output_file is written).
+
+        `state` is input_state(input_file) taken before processing started.
+        """
+        content_hash, input_stamp = state
+        output, output_stamp = self._output_entry(output_file)
+        self.entries[str(Path(input_file).resolve())] = {
+            'hash': content_hash,
+            'input_stamp': list(input_stamp),
+            'key': key,
+            'output': output,
+            'output_stamp': output_stamp
+        }
+        self.dirty = True
+
+    def forget(self, input_file):
+        if self.entries.pop(str(Path(input_file).resolve()), None) is not None:
+            self.dirty = True
+
+    def save(self):
+        """Write the manifest atomically (if anything changed)."""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_suffix('.tmp')
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({'version': PIPELINE_VERSION, 'files': self.entries}, f, indent=1)
+        os.replace(temp, self.path)
+        self.dirty = False
@@ -0,0 +1,263 @@
+import time
+from collections import Counter
+from .subtitles import SubtitleDocument, renumber
+from .formats import iter_subtitles, write_subtitles
+from .instrumentation import IteratorClock, emit
+
+# Stages run in this order no matter how they are selected
+STAGES = ('spellcheck', 'remove_sdh', 'adjust_timings')
+PROGRESS_EVERY = 250  # Cues between progress callbacks
+
+class PipelineCancelled(Exception):
+    """Raised by run_pipeline when its cancel event is set mid-file."""
+
+def when_done(cues, callback):
+    """Pass cues through, then call callback()."""
+    yield from cues
+    callback()
+
+def build_stages(stages, settings, stats=None):
+    """Turn stage names into (name, per-cue step) and (name, finisher) pairs.
+
+    Finishers take an iterator of cues and yield cues, so stages that need
+    neighbouring cues still run without holding the whole file in memory.
+    If a FileStats is given, stage-specific counters (cache hits, words
+    corrected, SDH tags removed) are added to it once the stream is exhausted.
+
+    `settings` uses the same schema as settings.json ("timing",
+    "formatting" and "sdh" blocks). Setting "columnar": true in the timing block
+    runs the timing rules on NumPy arrays instead of cue by cue.
+    """
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+
+    steps = []
+    finishers = []
+
+    # Each stage's modules (and their dependencies) are only imported when it is selected
+    if 'spellcheck' in stages:
+        from .spellchecker import spellcheck_cue, dictionary_version
+        from .spell_dictionary import get_spellchecker
+        from .correction_cache import get_cache
+        spell = get_spellchecker()
+        cache = get_cache('en', dictionary_version(spell),
+                          settings.get("spellcheck", {}).get("cache_file"))
+        tally = Counter()
+        steps.append(('spellcheck', lambda cue: spellcheck_cue(cue, spell, cache, tally=tally)))
+        hits, misses = cache.hits, cache.misses
+
+        def finish_spellcheck():
+            cache.flush()
+            if stats is not None:
+                stats.count('spellcheck_cache_hits', cache.hits - hits)
+                stats.count('spellcheck_cache_misses', cache.misses - misses)
+                stats.count('spellcheck_corrections', tally['corrections'])
+        finishers.append(('spellcheck', lambda cues: when_done(cues, finish_spellcheck)))
+
+    if 'remove_sdh' in stages:
+        from .sdh_cleaner import SDHCleaner
+        cleaner = SDHCleaner(**settings.get("sdh", {}))
+        steps.append(('remove_sdh', cleaner.clean_cue))
+
+    if 'adjust_timings' in stages:
+        from .timing_editor import retime_cue, resolve_gaps_stream
+        timing = settings["timing"]
+        formatting = settings["formatting"]
+        if timing.get("columnar"):
+            from .timing_columnar import retime_columnar
+            finishers.append(('adjust_timings', lambda cues: retime_columnar(
+                cues,
+                min_duration=timing["min_duration"],
+                max_duration=timing["max_duration"],
+                min_gap=timing["gap_between"],
+                chars_per_sec=timing["chars_per_sec"],
+                chars_per_line=formatting["chars_per_line"],
+                max_lines=formatting["max_lines"]
+            )))
+        else:
+            steps.append(('adjust_timings', lambda cue: retime_cue(
+                cue,
+                min_duration=timing["min_duration"],
+                max_duration=timing["max_duration"],
+                chars_per_sec=timing["chars_per_sec"],
+                chars_per_line=formatting["chars_per_line"],
+                max_lines=formatting["max_lines"]
+            )))
+            finishers.append(('adjust_timings', lambda cues: resolve_gaps_stream(
+                cues,
+                min_duration=timing["min_duration"],
+                min_gap=timing["gap_between"]
+            )))
+
+    if 'remove_sdh' in stages:
+        def finish_sdh():
+            if stats is not None:
+                for rule, n in cleaner.report.tags.items():
+                    stats.count(f'sdh_{rule}_removed', n)
+        # Renumbering closes the gaps left by dropped cues
+        finishers.append(('remove_sdh', lambda cues: when_done(renumber(cues), finish_sdh)))
+
+    return steps, finishers
+
+def process_stream(cues, stages, settings, counts=None, stats=None):
+    """Run the selected stages over a stream of cues, yielding results.
+
+    If a `counts` dict is given, it is kept updated with how many cues each
+    per-cue stage has handled so far. If a FileStats is given, every stage
+    is timed and its cue counts recorded (at a small per-cue cost).
+    """
+    steps, finishers = build_stages(stages, settings, stats)
+    if counts is None:
+        counts = {}
+    for name, _ in steps:
+        counts.setdefault(name, 0)
+    if stats is not None:
+        return instrumented_stream(cues, steps, finishers, counts, stats)
+
+    def apply_steps(cues):
+        for cue in cues:
+            for name, step in steps:
+                cue = step(cue)
+                counts[name] += 1
+                if cue is None:  # Stage dropped the cue
+                    break
+            else:
+                yield cue
+
+    cues = apply_steps(cues)
+    for _, finish in finishers:
+        cues = finish(cues)
+    return cues
+
+def instrumented_stream(cues, steps, finishers, counts, stats):
+    """process_stream with per-stage timing, cue counts and change counts.
+
+    A stage with both a step and a finisher (timing) counts each cue once:
+    cues its step already changed are flagged so the finisher doesn't
+    count them again. Cues are tracked as objects (Cue compares by
+    identity), never by id(), which a cue created after another was freed
+    could reuse.
+    """
+    clock = time.perf_counter
+    source = IteratorClock(cues)
+    read = stats.stage('read')  # Parsing the input
+    changed_by_step = {name: set() for name, _ in finishers}  # Cues a stage's step changed, until its finisher sees them
+    step_stats = [(name, step, stats.stage(name), changed_by_step.get(name)) for name, step in steps]
+
+    def apply_steps(cues):
+        for cue in cues:
+            for name, step, stage, changed in step_stats:
+                values = (cue.text, cue.start, cue.end)
+                started = clock()
+                result = step(cue)
+                stage.seconds += clock() - started
+                stage.cues_in += 1
+                counts[name] += 1
+                if result is None:
+                    for flagged in changed_by_step.values():
+                        flagged.discard(cue)
+                    break
+                stage.cues_out += 1
+                if (result.text, result.start, result.end) != values:
+                    stage.cues_changed += 1
+                    if changed is not None:
+                        changed.add(result)
+                cue = result
+            else:
+                yield cue
+
+    def snapshot(cues, stage, before, counted):
+        for cue in cues:
+            if not counted:
+                stage.cues_in += 1
+            before[cue] = (cue.text, cue.start, cue.end)
+            yield cue
+
+    def compare(cues, stage, before, changed, counted):
+        for cue in cues:
+            if not counted:
+                stage.cues_out += 1
+            if before.pop(cue, None) != (cue.text, cue.start, cue.end) and cue not in changed:
+                stage.cues_changed += 1
+            changed.discard(cue)
+            yield cue
+
+    def run_finisher(finish, cues):
+        yield from finish(cues)  # Defers list-returning finishers until the stream is pulled
+
+    stream = IteratorClock(apply_steps(source))
+    layers = []  # (stage, clock in, clock out); steps time themselves
+    counted = {name for name, _ in steps}  # Stages whose cues are already counted
+    for name, finish in finishers:
+        stage = stats.stage(name)
+        before = {}
+        feed = IteratorClock(snapshot(stream, stage, before, name in counted))
+        stream = IteratorClock(compare(run_finisher(finish, feed), stage, before, changed_by_step[name], name in counted))
+        counted.add(name)
+        layers.append((stage, feed, stream))
+
+    def finalize(cues):
+        yield from cues
+        read.seconds = source.seconds
+        read.cues_in = read.cues_out = source.items
+        for stage, feed, out in layers:
+            stage.seconds += out.seconds - feed.seconds
+
+    return finalize(stream)
+
+def process_document(doc, stages, settings):
+    """Run the selected stages over a parsed document in a single traversal."""
+    return SubtitleDocument(process_stream(doc, stages, settings))
+
+def run_pipeline(input_file, output_file, stages, settings, progress=None, cancel=None, stats=None):
+    """Stream cues from input_file through every selected stage into output_file.
+
+    Cues are parsed, processed and written one at a time, so memory stays
+    bounded regardless of file size. Returns the number of cues written.
+    input_file may be SRT or WebVTT. output_file is a path (format from its
+    extension) or a {format: path} mapping: every format is written from
+    the same single pass (see formats.output_paths).
+
+    `progress(counts, elapsed)` is called every PROGRESS_EVERY cues and once
+    at the end; `counts` holds cues handled per stage plus "written".
+    `cancel` is a threading.Event checked between cues: once set,
+    PipelineCancelled is raised and any earlier output is left untouched
+    (write_subtitles only replaces it once a file is complete).
+    `stats` is an optional FileStats to fill in; it is also sent to the
+    "file" instrumentation hooks when the file is done. Loading what the
+    stages need (dictionary, caches) is timed as its own "setup" stage.
+    """
+    counts = {}
+    started = time.monotonic()
+    setup = stats.stage('setup') if stats is not None else None
+    cues = process_stream(iter_subtitles(input_file), stages, settings, counts, stats)
+    if stats is not None:
+        setup.seconds = time.monotonic() - started
+        cues = IteratorClock(cues)
+
+    def monitored(cues):
+        written = 0
+        for cue in cues:
+            if cancel is not None and cancel.is_set():
+                raise PipelineCancelled(input_file)
+            yield cue
+            written += 1
+            if progress and written % PROGRESS_EVERY == 0:
+                progress(dict(counts, written=written), time.monotonic() - started)
+        if progress:
+            progress(dict(counts, written=written), time.monotonic() - started)
+
+    written = write_subtitles(monitored(cues) if progress or cancel else cues, output_file)
+
+    if stats is not None:
+        stats.input_file = str(input_file)
+        stats.output_file = (', '.join(map(str, output_file.values())) if isinstance(output_file, dict)
+                             else str(output_file))
+        stats.seconds = time.monotonic() - started
+        stats.cues_written = written
+        write = stats.stage('write')
+        write.seconds = stats.seconds - setup.seconds - cues.seconds
+        write.cues_in = write.cues_out = written
+        emit('file', stats.to_dict())
+    return written
@@ -0,0 +1,113 @@
+import threading
+import time
+
+# ======= CONFIGURATION =======
+FAILURE_THRESHOLD = 3  # Consecutive failures before a breaker opens
+COOLDOWN = 30.0  # Seconds an open breaker waits before a trial request
+SMOOTHING = 0.2  # Weight of the newest sample in the rolling averages
+ERROR_PENALTY = 5.0  # Seconds added to a key's score per unit of error rate
+PROBE_INTERVAL = 60.0  # Re-measure keys that haven't been used for this long
+RECHECK = 1.0  # Longest wait between checks while every breaker is open
+# =============================
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+
+class Health:
+    """Rolling stats and circuit breaker state for one provider or proxy."""
+    __slots__ = ('latency', 'error_rate', 'samples', 'failures', 'state', 'opened_at', 'last_sample')
+
+    def __init__(self):
+        self.latency = 0.0  # Rolling average, seconds
+        self.error_rate = 0.0  # Rolling average, 0..1
+        self.samples = 0
+        self.failures = 0  # Consecutive
+        self.state = CLOSED
+        self.opened_at = 0.0  # When the breaker opened or last let a trial through
+        self.last_sample = 0.0
+
+
+class HealthTracker:
+    """Tracks latency and errors per key and routes around failing ones.
+
+    Each key (a provider or proxy name) has a circuit breaker: it opens after
+    FAILURE_THRESHOLD consecutive failures, lets a single trial request
+    through once COOLDOWN has passed, and closes again on success.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, cooldown=COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._health = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        if key not in self._health:
+            self._health[key] = Health()
+        return self._health[key]
+
+    def record(self, key, latency, ok):
+        with self._lock:
+            health = self._get(key)
+            if health.samples:
+                health.latency += SMOOTHING * (latency - health.latency)
+                health.error_rate += SMOOTHING * ((0.0 if ok else 1.0) - health.error_rate)
+            else:
+                health.latency = latency
+                health.error_rate = 0.0 if ok else 1.0
+            health.samples += 1
+            health.last_sample = time.monotonic()
+
+            if ok:
+                health.failures = 0
+                health.state = CLOSED
+            else:
+                health.failures += 1
+                if health.state == HALF_OPEN or health.failures >= self.failure_threshold:
+                    health.state = OPEN
+                    health.opened_at = time.monotonic()
+
+    def allow(self, key):
+        """Whether a request may go to `key` right now."""
+        with self._lock:
+            health = self._get(key)
+            if health.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if now - health.opened_at >= self.cooldown:
+                # Cooled down (or the last trial never reported back): let one through
+                health.state = HALF_OPEN
+                health.opened_at = now
+                return True
+            return False
+
+    def retry_in(self, keys):
+        """Seconds until one of `keys` may take a request (0 if one can now).
+
+        Capped at RECHECK, since another caller's trial may close a breaker sooner.
+        """
+        with self._lock:
+            now = time.monotonic()
+            waits = [0.0 if health.state == CLOSED else health.opened_at + self.cooldown - now
+                     for health in map(self._get, keys)]
+        return min(max(min(waits, default=0.0), 0.0), RECHECK)
+
+    def score(self, key):
+        """Expected cost of a request: rolling latency plus a penalty for errors."""
+        health = self._get(key)
+        if not health.samples or time.monotonic() - health.last_sample > PROBE_INTERVAL:
+            return 0.0  # Untried or stale keys go first so they get (re)measured
+        return health.latency + ERROR_PENALTY * health.error_rate
+
+    def rank(self, keys):
+        """Keys ordered best first; ties keep the configured order."""
+        with self._lock:
+            return sorted(keys, key=lambda k: (self._get(k).state != CLOSED, self.score(k)))
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: {'state': h.state, 'latency': round(h.latency, 3),
+                      'error_rate': round(h.error_rate, 3), 'samples': h.samples}
+                for key, h in self._health.items()
+            }
@@ -1,24 +1,126 @@
 import re
+from collections import Counter
+from .subtitles import SubtitleDocument, iter_srt, write_srt, renumber
 
-def remove_hi_tags(input_file, output_file):
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Remove common HI tags (case-insensitive)
-    cleaned_content = re.sub(
-        r'\[(music|applause|laughter|sighs?|coughs?|noise|speaker|door|phone|ringing)\]',
-        '', 
-        content, 
-        flags=re.IGNORECASE
-    )
-    
-    # Remove empty subtitle blocks (optional)
-    cleaned_content = re.sub(r'\d+\n\d{2}:\d{2}:\d{2},\d{3} --> \d{2}:\d{2}:\d{2},\d{3}\n\s*\n', '', cleaned_content)
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(cleaned_content)
+# ======= CONFIGURATION =======
+HI_WORDS = (  # Tags brackets and parentheses strip unless any_tag is set
+    'music', 'applause', 'laughter', 'sighs?', 'coughs?', 'noise',
+    'speaker', 'door', 'phone', 'ringing'
+)
+MAX_LABEL = 30  # Longest speaker label ("JOHN:", "MAN ON PHONE:") that is stripped
+NOT_LABELS = (  # Uppercase words before a colon that are dialogue, not speakers
+    'OK', 'NO', 'YES', 'OH', 'SO', 'HEY', 'WELL', 'NOW', 'AND', 'BUT', 'WAIT', 'LOOK', 'NOTE', 'PS'
+)
+# =============================
+
+UPPER = "A-ZÀ-ÖØ-Þ"
+
+
+class SDHCleaner:
+    """Strips hearing-impaired annotations from cues in one regex pass.
+
+    Every enabled rule is a named branch of a single compiled pattern:
+      brackets        [applause]
+      parentheses     (sighs)
+      speaker_labels  JOHN: / - MAN ON PHONE:  at the start of a line
+      music           ♪ lyrics ♪ and stray note symbols
+
+    Brackets and parentheses are only stripped around the tags in `words`
+    (regex fragments, matched case-insensitively; HI_WORDS if None), since
+    parentheses in dialogue are common. any_tag=True strips whatever they
+    hold. Speaker labels are at least two characters and never one of
+    NOT_LABELS ("OK: fine" is dialogue). What was removed is tallied in `report`.
+    """
+
+    def __init__(self, brackets=True, parentheses=True, speaker_labels=True, music=True, words=None,
+                 any_tag=False):
+        if any_tag:
+            bracket_body, paren_body = r'[^\]\n]*', r'[^)\n]*'
+        else:
+            inner = '(?i:' + '|'.join(words or HI_WORDS) + ')'
+            bracket_body, paren_body = inner, inner
+
+        rules = []
+        self.triggers = ''.join(char for char, enabled in (
+            ('[', brackets), ('(', parentheses), (':', speaker_labels), ('♪♫', music)) if enabled)
+        if brackets:
+            rules.append(rf'(?P<brackets>\[\s*{bracket_body}\s*\])')
+        if parentheses:
+            rules.append(rf'(?P<parentheses>\(\s*{paren_body}\s*\))')
+        if speaker_labels:
+            not_label = '(?!(?:' + '|'.join(NOT_LABELS) + r')[ \t]*:)'
+            rules.append(rf"(?P<speaker_labels>^(?P<dash>[ \t]*-)?[ \t]*{not_label}"
+                         rf"[{UPPER}][{UPPER}0-9.'&-][{UPPER}0-9 .'&-]{{0,{MAX_LABEL - 2}}}:(?!\d)[ \t]*)")
+        if music:
+            rules.append(r'(?P<music>[♪♫][^♪♫\n]*[♪♫]|[♪♫])')
+        self.pattern = re.compile('|'.join(rules), flags=re.MULTILINE) if rules else None
+        self.report = SDHReport()
+
+    def _replace(self, match):
+        kind = match.lastgroup if match.lastgroup != 'dash' else 'speaker_labels'
+        self.report.tags[kind] += 1
+        if kind == 'speaker_labels':
+            self.report.removed[match.group(kind).strip(' \t-:').upper()] += 1
+            return '- ' if match.group('dash') else ''  # Keep the dialogue dash
+        self.report.removed[match.group(kind).strip().lower()] += 1
+        return ''
+
+    def clean_cue(self, cue):
+        """Strip annotations from one cue. Returns None if the cue is left empty."""
+        text = cue.text
+        # Most cues have nothing to strip; skip the regex unless a rule could match
+        if self.pattern is not None and any(char in text for char in self.triggers):
+            text = self.pattern.sub(self._replace, text)
+        if text != cue.text:
+            lines = [' '.join(line.split()) for line in text.split('\n')]  # Also closes gaps left mid-line
+            lines = [line for line in lines if line and line != '-']
+            if not lines:
+                self.report.cues_removed += 1
+                return None
+            cue.text = '\n'.join(lines)
+        self.report.cues_kept += 1
+        return cue
+
+    def clean_stream(self, cues):
+        """Clean a stream of cues, dropping emptied ones and renumbering the rest."""
+        return renumber(cue for cue in map(self.clean_cue, cues) if cue is not None)
+
+
+class SDHReport:
+    """What an SDHCleaner removed: matches per rule and per tag text."""
+
+    def __init__(self):
+        self.tags = Counter()  # Rule name -> matches
+        self.removed = Counter()  # Normalised tag text -> matches
+        self.cues_kept = 0
+        self.cues_removed = 0
+
+    def summary(self, top=10):
+        rules = ', '.join(f"{kind} {n}" for kind, n in self.tags.most_common()) or 'nothing'
+        common = ', '.join(f"{text} ({n})" for text, n in self.removed.most_common(top))
+        lines = [f"Removed {sum(self.tags.values())} tags ({rules}), dropped {self.cues_removed} empty cues, kept {self.cues_kept}"]
+        if common:
+            lines.append(f"Most common: {common}")
+        return '\n'.join(lines)
+
+
+_default = SDHCleaner()
+
+def clean_cue(cue):
+    """Strip HI annotations from one cue with the default rules. Returns None if left empty."""
+    return _default.clean_cue(cue)
+
+def clean_cues(doc, cleaner=None):
+    """Remove HI annotations from every cue, drop the ones left empty and renumber."""
+    return SubtitleDocument((cleaner or SDHCleaner()).clean_stream(doc))
+
+def remove_hi_tags(input_file, output_file, cleaner=None):
+    """Stream input_file through the cleaner into output_file. Returns its SDHReport."""
+    cleaner = cleaner or SDHCleaner()
+    write_srt(cleaner.clean_stream(iter_srt(input_file)), output_file)
+    return cleaner.report
 
 if __name__ == "__main__":
-    remove_hi_tags("input.srt", "cleaned.srt")
+    report = remove_hi_tags("input.srt", "cleaned.srt")
     print("Hearing-impaired tags removed. Saved to cleaned.srt")
-
+    print(report.summary())
@@ -0,0 +1,116 @@
+import json
+import mmap
+import os
+import tempfile
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+from spellchecker import SpellChecker
+import spellchecker as pyspellchecker
+
+# ======= CONFIGURATION =======
+DICTIONARY_DIR = Path.home() / '.cache' / 'subfix'  # Where compiled dictionaries live
+# =============================
+
+FORMAT_VERSION = 1
+
+# Compiled dictionary layout:
+#   one JSON header line (metadata + precomputed word stats)
+#   count * uint64 word frequencies
+#   '\n'-joined UTF-8 words, in the same order as the frequencies
+
+def dictionary_path(language='en', directory=None):
+    directory = Path(directory) if directory else DICTIONARY_DIR
+    return directory / f"{language}-{pyspellchecker.__version__}.dict"
+
+def build_dictionary(language='en', path=None):
+    """Compile pyspellchecker's gzipped JSON word list into the compact format."""
+    path = Path(path) if path else dictionary_path(language)
+    frequency = SpellChecker(language=language).word_frequency
+
+    words = list(frequency.dictionary.keys())
+    header = {
+        'format': FORMAT_VERSION,
+        'language': language,
+        'pyspellchecker': pyspellchecker.__version__,
+        'count': len(words),
+        'total_words': frequency.total_words,
+        'longest_word_length': frequency.longest_word_length,
+        'letters': ''.join(sorted(frequency.letters)),
+    }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A temp file of its own, so processes building at the same time never
+    # write into each other's; the rename never leaves a half-written dictionary
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix='.tmp', delete=False) as f:
+        try:
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            f.write(array('Q', (frequency.dictionary[word] for word in words)).tobytes())
+            f.write('\n'.join(words).encode('utf-8'))
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+    return path
+
+def load_dictionary(path):
+    """Load a compiled dictionary into a new SpellChecker."""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header_end = mm.find(b'\n')
+            header = json.loads(mm[:header_end])
+            if header.get('format') != FORMAT_VERSION or header.get('pyspellchecker') != pyspellchecker.__version__:
+                raise ValueError(f"Outdated dictionary: {path}")
+
+            count = header['count']
+            freq_start = header_end + 1
+            words_start = freq_start + count * 8
+            frequencies = array('Q')
+            frequencies.frombytes(mm[freq_start:words_start])
+            words = mm[words_start:].decode('utf-8').split('\n')
+
+    if len(words) != count:
+        raise ValueError(f"Corrupt dictionary: {path}")
+
+    spell = SpellChecker(language=None)
+    # pyspellchecker has no public bulk loader that skips re-lowercasing and
+    # recomputing stats, so fill WordFrequency directly with the values
+    # saved at build time.
+    frequency = spell.word_frequency
+    frequency._dictionary = Counter(dict(zip(words, frequencies)))
+    frequency._total_words = header['total_words']
+    frequency._unique_words = count
+    frequency._longest_word_length = header['longest_word_length']
+    frequency._letters = set(header['letters'])
+    return spell
+
+def load_spellchecker(language='en', path=None):
+    """Load the compiled dictionary for `language`, building it first if needed."""
+    path = Path(path) if path else dictionary_path(language)
+    try:
+        return load_dictionary(path)
+    except (OSError, ValueError, KeyError):  # Missing, outdated, truncated or corrupt
+        pass
+    try:
+        build_dictionary(language, path)
+        return load_dictionary(path)
+    except (OSError, ValueError, KeyError):
+        # Read-only cache dir, or replaced by a bad file meanwhile - fall back to the stock loader
+        return SpellChecker(language=language)
+
+_loaded = {}
+_lock = threading.Lock()
+
+def get_spellchecker(language='en'):
+    """Return this process's shared SpellChecker for `language`.
+
+    Loaded once and reused for every file. Worker processes forked after
+    loading start with it already in memory; others map the same compiled
+    file from the OS page cache.
+    """
+    with _lock:
+        if language not in _loaded:
+            _loaded[language] = load_spellchecker(language)
+        return _loaded[language]
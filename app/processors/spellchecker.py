@@ -1,50 +1,165 @@
-from spellchecker import SpellChecker
+import spellchecker as pyspellchecker
 import re
-from pathlib import Path
-
-def spellcheck_srt(input_file, output_file):
-    spell = SpellChecker()
-    
-    input_path = Path(input_file)
-    output_path = Path(output_file)
-    
-    content = input_path.read_text(encoding='utf-8')
-    
-    # Split into subtitle blocks
-    blocks = re.split(r'\n\s*\n', content.strip())
-    processed_blocks = []
-    
-    for block in blocks:
-        if not block.strip():
-            continue
-        
-        lines = block.split('\n')
-        if len(lines) < 3:  # Skip malformed blocks
-            processed_blocks.append(block)
-            continue
-        
-        # Process text lines (lines[2] and beyond)
-        text_lines = lines[2:]
-        corrected_lines = []
-        
-        for line in text_lines:
-            words = re.findall(r'\b\w+\b', line)  # Extract words
-            misspelled = spell.unknown(words)  # Get all misspelled words at once
-            for word in misspelled:
-                correction = spell.correction(word)
-                if correction:
-                    line = line.replace(word, correction, 1)  # Replace first occurrence
-            corrected_lines.append(line)
-        
-        # Rebuild block
-        processed_block = '\n'.join([lines[0], lines[1]] + corrected_lines)
-        processed_blocks.append(processed_block)
-    
-    # Write corrected subtitles
-    output_path.write_text('\n\n'.join(processed_blocks), encoding='utf-8')
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .subtitles import SubtitleDocument, iter_srt, write_srt
+from .correction_cache import MISSING, get_cache
+from .spell_dictionary import get_spellchecker
+
+WORD = re.compile(r'\b\w+\b')
+
+def dictionary_version(spell):
+    """Identify the dictionary a SpellChecker uses, for cache keys."""
+    return f"pyspellchecker-{pyspellchecker.__version__}:d{spell.distance}"
+
+def correct_words(words, spell, cache=None):
+    """Return {word: correction} for each unique word, checking the cache first."""
+    corrections = {}
+    for word in set(words):
+        correction = cache.get(word) if cache is not None else MISSING
+        if correction is MISSING:
+            correction = spell.correction(word)
+            if cache is not None:
+                cache.put(word, correction)
+        corrections[word] = correction
+    return corrections
+
+# ======= PROCESS POOL =======
+_worker_spell = None  # Loaded once per worker process
+_pool = None  # Shared by correct_words_parallel calls, see get_pool
+_pool_workers = 0
+
+def _init_worker():
+    global _worker_spell
+    _worker_spell = get_spellchecker()
+
+def _correct_chunk(words):
+    return {word: _worker_spell.correction(word) for word in words}
+
+def _spellcheck_file_job(job):
+    input_file, output_file, cache_file = job
+    spellcheck_srt(input_file, output_file, cache_file, spell=_worker_spell)
+    return output_file
+
+def get_pool(workers=None):
+    """The process pool correct_words_parallel uses by default.
+
+    Created on first use and reused by later calls (so workers load the
+    dictionary once per process, not once per document); asking for a
+    different worker count replaces it.
+    """
+    global _pool, _pool_workers
+    workers = workers or os.cpu_count() or 1
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        _pool_workers = workers
+    return _pool
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+def correct_words_parallel(words, cache=None, workers=None, pool=None):
+    """Like correct_words, but spreads uncached words over a process pool.
+
+    `pool` is a ProcessPoolExecutor started with initializer=_init_worker;
+    by default the shared one from get_pool(workers).
+    """
+    workers = workers or os.cpu_count() or 1
+    corrections = {}
+    pending = []
+    for word in set(words):
+        correction = cache.get(word) if cache is not None else MISSING
+        if correction is MISSING:
+            pending.append(word)
+        else:
+            corrections[word] = correction
+
+    if pending:
+        chunk_size = max(1, len(pending) // (workers * 4) + 1)
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        for result in (pool or get_pool(workers)).map(_correct_chunk, chunks):
+            for word, correction in result.items():
+                if cache is not None:
+                    cache.put(word, correction)
+                corrections[word] = correction
+    return corrections
+# ============================
+
+def spellcheck_cue(cue, spell, cache=None, corrections=None, tally=None):
+    """Correct misspelled words in one cue's text lines.
+
+    `corrections` is an optional precomputed {word: correction} map; words
+    missing from it are looked up through `cache`. If a Counter is given as
+    `tally`, tally['corrections'] grows by the number of words replaced.
+    """
+    corrected_lines = []
+
+    for line in cue.text.split('\n'):
+        words = WORD.findall(line)  # Extract words
+        misspelled = spell.unknown(words)  # Get all misspelled words at once
+        if corrections is None or not misspelled.issubset(corrections):
+            line_corrections = correct_words(misspelled, spell, cache)
+        else:
+            line_corrections = corrections
+        for word in misspelled:
+            correction = line_corrections[word]
+            if correction and correction != word:
+                line = line.replace(word, correction, 1)  # Replace first occurrence
+                if tally is not None:
+                    tally['corrections'] += 1
+        corrected_lines.append(line)
+
+    cue.text = '\n'.join(corrected_lines)
+    return cue
+
+def spellcheck_cues(doc, spell=None, cache=None, workers=1):
+    """Spellcheck every cue in a SubtitleDocument.
+
+    The document's vocabulary is collected first so each unique unknown
+    word is corrected once, however often it appears. With workers > 1
+    those corrections are computed in a process pool.
+    """
+    spell = spell or get_spellchecker()
+    cues = list(doc)
+
+    vocabulary = set()
+    for cue in cues:
+        vocabulary.update(WORD.findall(cue.text))
+    unknown = spell.unknown(vocabulary)
+    if workers > 1:
+        corrections = correct_words_parallel(unknown, cache, workers)
+    else:
+        corrections = correct_words(unknown, spell, cache)
+
+    return SubtitleDocument(spellcheck_cue(cue, spell, corrections=corrections) for cue in cues)
+
+def spellcheck_srt(input_file, output_file, cache_file=None, spell=None):
+    """Spellcheck an SRT file.
+
+    Corrections are cached for the whole process (and in `cache_file`
+    across runs, if given), so repeat episodes mostly skip the slow
+    edit-distance search.
+    """
+    spell = spell or get_spellchecker()
+    cache = get_cache('en', dictionary_version(spell), cache_file)
+    write_srt((spellcheck_cue(cue, spell, cache) for cue in iter_srt(input_file)), output_file)
+    cache.flush()
+
+def spellcheck_files(jobs, cache_file=None, workers=None):
+    """Spellcheck many (input_file, output_file) pairs on a process pool.
+
+    Each worker loads the dictionary once and keeps its own in-memory
+    correction cache; all of them share `cache_file` on disk (see
+    CorrectionCache). Returns the output files in the order given.
+    """
+    jobs = [(input_file, output_file, cache_file) for input_file, output_file in jobs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(_spellcheck_file_job, jobs))
 
 if __name__ == "__main__":
     spellcheck_srt("input.srt", "spellchecked.srt")
     print("Spell-checked subtitles saved to spellchecked.srt")
-
-
@@ -0,0 +1,152 @@
+import re
+
+BLOCK_SEPARATOR = re.compile(r'\n\s*\n')
+
+
+class Cue:
+    """One subtitle event. Times are integer milliseconds."""
+    __slots__ = ('num', 'start', 'end', 'text')
+
+    def __init__(self, num, start, end, text):
+        self.num = num
+        self.start = start
+        self.end = end
+        self.text = text
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"Cue({self.num!r}, {format_timecode(self.start)} --> {format_timecode(self.end)}, {self.text!r})"
+
+
+class SubtitleDocument:
+    """Parsed subtitle file that every processor reads from and returns."""
+
+    def __init__(self, cues=None):
+        self.cues = list(cues) if cues is not None else []
+
+    def __iter__(self):
+        return iter(self.cues)
+
+    def __len__(self):
+        return len(self.cues)
+
+
+def format_timecode(ms):
+    """Format integer milliseconds as an SRT timecode (HH:MM:SS,mmm)."""
+    ms = max(int(ms), 0)
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+
+
+def parse_timecode(timecode):
+    """Parse an SRT timecode (HH:MM:SS,mmm) into integer milliseconds.
+
+    Hand-rolled rather than strptime/regex since it runs twice per cue.
+    Raises ValueError on malformed input.
+    """
+    timecode = timecode.strip()
+    if len(timecode) != 12 or timecode[2] != ':' or timecode[5] != ':' or timecode[8] not in ',.':
+        raise ValueError(f"Invalid timecode: {timecode!r}")
+    return (int(timecode[0:2]) * 3600000 + int(timecode[3:5]) * 60000
+            + int(timecode[6:8]) * 1000 + int(timecode[9:12]))
+
+
+def parse_block(block):
+    """Parse one SRT block into a Cue, or None if it has no valid timecode."""
+    lines = [line.strip() for line in block.split('\n') if line.strip()]
+    if len(lines) < 2:
+        return None
+
+    start_str, arrow, end_str = lines[1].partition(' --> ')
+    if not arrow:
+        return None
+    try:
+        start = parse_timecode(start_str)
+        end = parse_timecode(end_str[:12])
+    except ValueError:
+        return None
+    return Cue(lines[0], start, end, '\n'.join(lines[2:]))
+
+
+def parse_srt(content):
+    """Parse SRT text into a SubtitleDocument."""
+    cues = []
+    for block in BLOCK_SEPARATOR.split(content.strip()):
+        cue = parse_block(block)
+        if cue is not None:
+            cues.append(cue)
+    return SubtitleDocument(cues)
+
+
+def read_srt(input_file):
+    """Read and parse a whole SRT file."""
+    return SubtitleDocument(iter_srt(input_file))
+
+
+def iter_srt(input_file):
+    """Yield cues from an SRT file one at a time, reading line by line."""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        block = []
+        for line in f:
+            if line.strip():
+                block.append(line)
+            elif block:
+                cue = parse_block(''.join(block))
+                if cue is not None:
+                    yield cue
+                block = []
+        if block:
+            cue = parse_block(''.join(block))
+            if cue is not None:
+                yield cue
+
+
+def count_cues(input_file):
+    """Fast estimate of an SRT file's cue count (its timecode arrows), for progress bars."""
+    count = 0
+    with open(input_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            count += chunk.count(b'-->')  # Arrows never straddle lines, so a split chunk loses at most one
+    return count
+
+
+def renumber(cues, start=1):
+    """Yield cues numbered consecutively from `start` (after cues were dropped)."""
+    for num, cue in enumerate(cues, start):
+        cue.num = num
+        yield cue
+
+
+def with_next(cues):
+    """Yield (cue, next_cue) pairs; next_cue is None for the last cue.
+
+    Stages that look at the following cue (like the min-gap pass) use this
+    as a one-cue lookahead window instead of needing the whole list.
+    """
+    cues = iter(cues)
+    current = next(cues, None)
+    for next_cue in cues:
+        yield current, next_cue
+        current = next_cue
+    if current is not None:
+        yield current, None
+
+
+def format_cue(cue):
+    return f"{cue.num}\n{format_timecode(cue.start)} --> {format_timecode(cue.end)}\n{cue.text}\n\n"
+
+
+def write_srt(cues, output_file):
+    """Write cues (a SubtitleDocument or any iterable of Cue) as SRT.
+
+    Cues are written as they arrive, so a generator is never materialised.
+    Returns the number of cues written. See formats.write_subtitles for
+    other formats, or several at once.
+    """
+    from .formats import write_subtitles
+    return write_subtitles(cues, {'srt': output_file})
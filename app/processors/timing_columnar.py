@@ -0,0 +1,57 @@
+import numpy as np
+from .timing_editor import process_text_content, to_ms
+
+def retime_columnar(cues, min_duration, max_duration,
+                    min_gap, chars_per_sec,
+                    chars_per_line, max_lines):
+    """Columnar version of timing_editor.retime_stream.
+
+    Text is still reformatted cue by cue, but all timing rules run as NumPy
+    array operations over the whole file. Gives the same results as the
+    scalar path and returns the cues as a list. Per-cue text layout
+    dominates, so on the benchmarks it only pulls ahead on large files
+    (within noise at 20,000 cues, about 25% faster at 100,000), and it
+    needs the whole file in memory: about 4x the scalar path's peak.
+    """
+    cues = list(cues)
+    if not cues:
+        return cues
+
+    for cue in cues:
+        cue.text = process_text_content(cue.text, chars_per_line, max_lines)
+
+    start = np.fromiter((cue.start for cue in cues), dtype=np.int64, count=len(cues))
+    end = np.fromiter((cue.end for cue in cues), dtype=np.int64, count=len(cues))
+    text_len = np.fromiter((len(cue.text) - cue.text.count('\n') for cue in cues),
+                           dtype=np.float64, count=len(cues))
+
+    min_duration_ms = to_ms(min_duration)
+    max_ms = to_ms(max_duration)
+    min_gap_ms = to_ms(min_gap)
+
+    # Min duration / chars-per-second extension
+    reading_time = text_len / chars_per_sec if chars_per_sec > 0 else np.zeros_like(text_len)
+    required_ms = np.rint(np.maximum(min_duration, reading_time) * 1000).astype(np.int64)
+    end = np.maximum(end, start + required_ms)
+
+    # Max duration clamp
+    if max_ms > 0:
+        end = np.minimum(end, start + max_ms)
+
+    # Min gap. A push only moves the cue and everything after it, so
+    # comparing each cue with the next one in original coordinates gives
+    # the same decisions as the scalar pass; pushes then accumulate.
+    next_start = start[1:]
+    overlaps = end[:-1] > next_start - min_gap_ms
+    trimmed_end = np.maximum(next_start - min_gap_ms, start[:-1] + min_duration_ms)
+    end[:-1] = np.where(overlaps, trimmed_end, end[:-1])
+
+    shift = np.where(overlaps, np.maximum(end[:-1] + min_gap_ms - next_start, 0), 0)
+    offset = np.concatenate(([0], np.cumsum(shift)))
+    start += offset
+    end += offset
+
+    for cue, cue_start, cue_end in zip(cues, start.tolist(), end.tolist()):
+        cue.start = cue_start
+        cue.end = cue_end
+    return cues
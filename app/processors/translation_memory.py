@@ -0,0 +1,105 @@
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# ======= CONFIGURATION =======
+MAX_ENTRIES = 500000  # Oldest entries are evicted above this
+MAX_AGE_DAYS = 365  # Entries older than this are evicted (None = keep forever)
+COMMIT_EVERY = 50  # Batch disk commits
+# =============================
+
+SPACES = re.compile(r'[^\S\n]+')  # Whitespace other than line breaks
+
+def normalize(text):
+    """Key form of a subtitle: each line trimmed and single-spaced.
+
+    Line breaks are kept, so texts laid out differently get their own
+    entries and a stored layout is never applied to another one.
+    """
+    return '\n'.join(line.strip() for line in SPACES.sub(' ', text.strip()).split('\n'))
+
+
+class TranslationMemory:
+    """Persistent source -> translation store, checked before any provider call.
+
+    Entries are keyed by normalized source text, source language, target
+    language and the provider that produced the translation. Use it as a
+    context manager (or call close()) so pending entries are committed
+    even if a run fails.
+    """
+
+    def __init__(self, path, max_entries=MAX_ENTRIES, max_age_days=MAX_AGE_DAYS):
+        self.path = Path(path).expanduser()
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " source_text TEXT, source_lang TEXT, target_lang TEXT, provider TEXT,"
+            " translated_text TEXT, created REAL,"
+            " PRIMARY KEY (source_text, source_lang, target_lang, provider))"
+        )
+        self._db.commit()
+
+    def lookup(self, text, source_lang, target_lang, providers):
+        """Return a stored translation, preferring providers in the given order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT provider, translated_text FROM translations"
+                " WHERE source_text = ? AND source_lang = ? AND target_lang = ?",
+                (normalize(text), source_lang, target_lang)
+            ).fetchall()
+            found = dict(rows)
+            for provider in providers:
+                if provider in found:
+                    self.hits += 1
+                    return found[provider]
+            self.misses += 1
+            return None
+
+    def store(self, text, source_lang, target_lang, provider, translated_text):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize(text), source_lang, target_lang, provider, translated_text, time.time())
+            )
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._db.commit()
+                self._pending = 0
+
+    def evict(self):
+        """Drop entries past max_age_days, then the oldest beyond max_entries."""
+        with self._lock:
+            if self.max_age_days is not None:
+                cutoff = time.time() - self.max_age_days * 86400
+                self._db.execute("DELETE FROM translations WHERE created < ?", (cutoff,))
+            self._db.execute(
+                "DELETE FROM translations WHERE rowid IN ("
+                " SELECT rowid FROM translations ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+            self._pending = 0
+
+    def close(self):
+        try:
+            self.evict()
+        finally:
+            with self._lock:
+                self._db.commit()
+                self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
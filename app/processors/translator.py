@@ -1,14 +1,21 @@
+import os
 import re
-import json
 import time
+import threading
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
-from deep_translator import GoogleTranslator, LibreTranslator, MicrosoftTranslator
-from langdetect import detect
+from itertools import zip_longest
+from .subtitles import Cue
+from .formats import iter_subtitles, write_subtitles
+from .translation_memory import TranslationMemory
+from .journal import TranslationJournal
+from .manifest import file_hash
+from .provider_health import HealthTracker
+from . import http_pool
+from .instrumentation import emit
 
 # ======= CONFIGURATION =======
 TARGET_LANG = 'es'  # Example: 'fr', 'de', 'zh'
-WORKERS = 3  # Conservative to avoid bans
+WORKERS = 3  # Requests in flight at once (conservative to avoid bans)
 MAX_CHARS_PER_REQUEST = 4500  # Stay under provider limits
 REQUEST_DELAY = 1.0  # Seconds between requests
 PROXY_LIST = [  # Rotating proxies (http/s)
@@ -16,11 +23,18 @@ PROXY_LIST = [  # Rotating proxies (http/s)
     'http://proxy1.example.com:8080',
     'http://proxy2.example.com:8080'
 ]
-BATCH_SAVE_EVERY = 20  # Save progress every N subtitles
+HTTP_POOL_SIZE = 10  # Keep-alive connections per provider host, per thread
+LIBRE_URL = 'https://libretranslate.de/'  # Point at a local server for testing
+LIBRE_API_KEY = os.environ.get('LIBRE_API_KEY')  # deep_translator refuses to call Libre without one (any value for keyless servers)
+SEGMENT_MARKER = '[#{}]'  # Separates cues packed into one request
+TRANSLATION_MEMORY = '~/.cache/subfix/translation_memory.db'  # Reused translations (None to disable)
 # =============================
 
+SEGMENT_SPLIT = re.compile(r'\[\s*#\s*(\d+)\s*\]')
+
 class SubtitleTranslator:
-    def __init__(self):
+    def __init__(self, memory=None):
+        self.memory = memory  # Optional TranslationMemory
         self.translated_count = 0
         self.failed_count = 0
         self.current_proxy = None
@@ -30,57 +44,132 @@ class SubtitleTranslator:
             self._try_microsoft,
             self._try_libre
         ]
+        self.proxied_providers = {'microsoft'}  # Providers that go through current_proxy
+        self.health = HealthTracker()  # Per provider
+        self.proxy_health = HealthTracker()  # Per proxy
+        self._clients = threading.local()  # Provider clients, see _client()
+        http_pool.install(HTTP_POOL_SIZE)  # Keep-alive sessions for all provider requests
 
     def _rotate_proxy(self):
-        """Rotate through available proxies"""
-        self.proxy_rotation_index = (self.proxy_rotation_index + 1) % len(PROXY_LIST)
-        self.current_proxy = PROXY_LIST[self.proxy_rotation_index]
+        """Switch to the healthiest proxy whose breaker allows traffic"""
+        by_key = {str(proxy): proxy for proxy in PROXY_LIST}
+        others = [key for key in by_key if key != str(self.current_proxy)]
+        for key in self.proxy_health.rank(others + [str(self.current_proxy)]):
+            if self.proxy_health.allow(key):
+                self.current_proxy = by_key[key]
+                break
+        self.proxy_rotation_index = PROXY_LIST.index(self.current_proxy)
         return self.current_proxy
 
-    def _try_google(self, text, source_lang, target_lang):
+    def ranked_providers(self):
+        """Providers ordered fastest healthy first (ties keep provider_order)"""
+        by_name = {self._provider_name(p): p for p in self.provider_order}
+        return [(name, by_name[name]) for name in self.health.rank(list(by_name))]
+
+    def _record(self, name, proxy, latency, result):
+        """Feed one provider call's outcome into the health trackers"""
+        ok = bool(result)
+        self.health.record(name, latency, ok)
+        if name in self.proxied_providers:
+            self.proxy_health.record(str(proxy), latency, ok)
+
+    def _call_tracked(self, name, provider, text, source_lang, target_lang, batch=False):
+        """Call one provider (None on failure) and feed the outcome into the health trackers.
+
+        Errors about the text itself (see is_content_error) say nothing about
+        the provider and are not held against it; neither are failures of a
+        packed request (batch=True), since one bad cue fails the whole pack
+        and its cues are retried one by one anyway.
+        """
+        proxy = self.current_proxy
+        started = time.monotonic()
         try:
-            return GoogleTranslator(
-                source=source_lang,
-                target=target_lang
-            ).translate(text[:MAX_CHARS_PER_REQUEST])
+            result = provider(text, source_lang, target_lang)
         except Exception as e:
-            print(f"Google failed: {str(e)}")
-            print(f"   Text: {text[:50]}...")
-            print(f"   Target language: {target_lang}, Source language: {source_lang}")
-            return None
+            print(f"{name.capitalize()} failed: {str(e)[:100]}")
+            if is_content_error(e):
+                return None
+            result = None
+        if result or not batch:
+            self._record(name, proxy, time.monotonic() - started, result)
+        return result
+
+    def _client(self, provider_class, **kwargs):
+        """Reuse one provider client per thread and settings instead of one per cue"""
+        clients = getattr(self._clients, 'cache', None)
+        if clients is None:
+            clients = self._clients.cache = {}
+        key = (provider_class, repr(sorted(kwargs.items())))
+        if key not in clients:
+            clients[key] = provider_class(**kwargs)
+        return clients[key]
+
+    def _try_google(self, text, source_lang, target_lang):
+        from deep_translator import GoogleTranslator  # Loaded by http_pool.install() already
+        return self._client(
+            GoogleTranslator,
+            source=source_lang,
+            target=target_lang
+        ).translate(text[:MAX_CHARS_PER_REQUEST])
 
     def _try_microsoft(self, text, source_lang, target_lang):
-        try:
-            # Requires API key - set env var MICROSOFT_TRANSLATOR_KEY
-            return MicrosoftTranslator(
-                source=source_lang,
-                target=target_lang,
-                proxies={'https': self.current_proxy}
-            ).translate(text[:MAX_CHARS_PER_REQUEST])
-        except Exception as e:
-            print(f"Microsoft failed: {str(e)[:100]}")
-            return None
+        from deep_translator import MicrosoftTranslator  # Loaded by http_pool.install() already
+        # Requires API key - set env var MICROSOFT_TRANSLATOR_KEY
+        return self._client(
+            MicrosoftTranslator,
+            source=source_lang,
+            target=target_lang,
+            proxies={'https': self.current_proxy}
+        ).translate(text[:MAX_CHARS_PER_REQUEST])
 
     def _try_libre(self, text, source_lang, target_lang):
-        try:
-            return LibreTranslator(
-                source=source_lang,
-                target=target_lang,
-                base_url='https://libretranslate.de'
-            ).translate(text[:MAX_CHARS_PER_REQUEST])
-        except Exception as e:
-            print(f"Libre failed: {str(e)[:100]}")
-            return None
+        from deep_translator import LibreTranslator  # Loaded by http_pool.install() already
+        return self._client(
+            LibreTranslator,
+            source=source_lang,
+            target=target_lang,
+            api_key=LIBRE_API_KEY,
+            custom_url=LIBRE_URL
+        ).translate(text[:MAX_CHARS_PER_REQUEST])
+
+    @staticmethod
+    def _provider_name(provider):
+        return provider.__name__.replace('_try_', '')
+
+    def provider_names(self):
+        return [self._provider_name(p) for p in self.provider_order]
+
+    def stats(self):
+        """Counts, translation memory hits and per-provider/proxy health"""
+        stats = {
+            'translated': self.translated_count,
+            'failed': self.failed_count,
+            'providers': self.health.snapshot(),
+            'proxies': self.proxy_health.snapshot()
+        }
+        if self.memory is not None:
+            stats['memory_hits'] = self.memory.hits
+            stats['memory_misses'] = self.memory.misses
+        return stats
 
     def detect_language(self, text_sample):
         """Auto-detect source language from sample text"""
         try:
+            from langdetect import detect  # Loads its language profiles on first use
             return detect(text_sample)
         except:
             return 'auto'
 
     def translate_text(self, text, target_lang, source_lang='auto'):
         """Robust translation with all fallbacks"""
+        translated = self.try_translate_text(text, target_lang, source_lang)
+        return text if translated is None else translated  # Return original as fallback
+
+    def try_translate_text(self, text, target_lang, source_lang='auto', recall=True):
+        """Translate text, or return None (counted in failed_count) if every provider failed.
+
+        recall=False skips the translation memory when the caller already missed it.
+        """
         if not text.strip():
             print("⚠️ Skipping empty or invalid text.")
             return text
@@ -88,151 +177,305 @@ class SubtitleTranslator:
         # Chunk large texts
         if len(text) > MAX_CHARS_PER_REQUEST:
             chunks = [text[i:i+MAX_CHARS_PER_REQUEST] for i in range(0, len(text), MAX_CHARS_PER_REQUEST)]
-            return ' '.join([self.translate_text(chunk, target_lang, source_lang) for chunk in chunks])
+            parts = [self.try_translate_text(chunk, target_lang, source_lang, recall) for chunk in chunks]
+            return None if None in parts else ' '.join(parts)
 
-        # Try all providers with proxy rotation
-        for attempt in range(3):  # Max 3 attempts
-            self._rotate_proxy()
-            for provider in self.provider_order:
-                result = provider(text, source_lang, target_lang)
-                if result:
-                    time.sleep(REQUEST_DELAY)
-                    return result
-            print(f"⚠️ All providers failed on attempt {attempt + 1}. Retrying...")
-            time.sleep(5)  # Backoff on complete failure
+        # Reuse earlier translations before touching the network
+        cached = self._recall(text, source_lang, target_lang) if recall else None
+        if cached is not None:
+            return cached
+
+        result, provider_name = self._call_providers(text, source_lang, target_lang)
+        if result:
+            self._remember(text, source_lang, target_lang, provider_name, result)
+            return result
 
         self.failed_count += 1
         print(f"⚠️ Failed to translate: {text[:50]}...")
         print(f"   Target language: {target_lang}, Source language: {source_lang}")
         print(f"   Last proxy used: {self.current_proxy}")
-        return text  # Return original as fallback
+        return None
+
+    def _recall(self, text, source_lang, target_lang):
+        """Translation memory lookup (None on miss or without a memory)"""
+        if self.memory is None:
+            return None
+        return self.memory.lookup(text, source_lang, target_lang, self.provider_names())
+
+    def _remember(self, text, source_lang, target_lang, provider_name, translated):
+        if self.memory is not None:
+            self.memory.store(text, source_lang, target_lang, provider_name, translated)
+
+    def _call_providers(self, text, source_lang, target_lang, batch=False):
+        """Try all providers with proxy rotation. Returns (result, provider name)
+
+        While every breaker is open, waits for one to allow a trial request
+        instead of using up attempts. See _call_tracked for `batch`.
+        """
+        attempt = 0
+        while attempt < 3:  # Max 3 attempts
+            self._rotate_proxy()
+            tried = False
+            for name, provider in self.ranked_providers():
+                if not self.health.allow(name):  # Circuit open - skip without a request
+                    continue
+                tried = True
+                result = self._call_tracked(name, provider, text, source_lang, target_lang, batch)
+                if result:
+                    time.sleep(REQUEST_DELAY)
+                    return result, name
+            if not tried:
+                time.sleep(self.health.retry_in(self.provider_names()))
+                continue
+            attempt += 1
+            print(f"⚠️ All providers failed on attempt {attempt}. Retrying...")
+            time.sleep(5)  # Backoff on complete failure
+        return None, None
 
-    def process_subtitle(self, sub, target_lang, source_lang):
+    def process_batch(self, pack, target_lang, source_lang):
+        """Translate a pack of consecutive subtitles in as few requests as possible"""
+        if len(pack) == 1:
+            return [self.process_subtitle(pack[0], target_lang, source_lang)]
+
+        translations = [self._recall(sub['text'], source_lang, target_lang) for sub in pack]
+        missing = [i for i, translated in enumerate(translations) if translated is None]
+
+        if len(missing) > 1:
+            joined = join_segments([pack[i]['text'] for i in missing])
+            result, provider_name = self._call_providers(joined, source_lang, target_lang, batch=True)
+            segments = split_segments(result, len(missing)) if result else None
+            if segments:
+                for i, segment in zip(missing, segments):
+                    translations[i] = segment
+                    self._remember(pack[i]['text'], source_lang, target_lang, provider_name, segment)
+            else:
+                print(f"⚠️ Batch of {len(missing)} subtitles did not align, translating one by one...")
+
+        results = []
+        for sub, translated in zip(pack, translations):
+            if translated is None:
+                results.append(self.process_subtitle(sub, target_lang, source_lang, recall=False))  # Already a miss
+            else:
+                self.translated_count += 1
+                results.append(translated_result(sub, translated))
+        return results
+
+    def process_subtitle(self, sub, target_lang, source_lang, recall=True):
         """Process single subtitle with progress tracking"""
         try:
-            result = {
-                'num': sub['num'],
-                'timecode': sub['timecode'],
-                'original_text': sub['text'],
-                'translated_text': self.translate_text(sub['text'], target_lang, source_lang)
-            }
-            self.translated_count += 1
-            return result
+            translated = self.try_translate_text(sub['text'], target_lang, source_lang, recall)
         except Exception as e:
             print(f"⚠️ Failed to process subtitle {sub['num']}: {str(e)}")
             self.failed_count += 1
-            return {
-                'num': sub['num'],
-                'timecode': sub['timecode'],
-                'original_text': sub['text'],
-                'translated_text': sub['text']  # Return original text as fallback
-            }
+            translated = None
+        if translated is None:
+            return translated_result(sub, sub['text'], failed=True)  # Return original text as fallback
+        self.translated_count += 1
+        return translated_result(sub, translated)
+
+def is_content_error(error):
+    """Whether a provider rejected the text itself rather than failing"""
+    from deep_translator.exceptions import NotValidLength, NotValidPayload, TranslationNotFound
+    return isinstance(error, (NotValidLength, NotValidPayload, TranslationNotFound))
+
+def translated_result(sub, translated_text, failed=False):
+    """Result entry for one subtitle; failed=True when translated_text is the untranslated fallback"""
+    return {
+        'failed': failed,
+        'num': sub['num'],
+        'start': sub['start'],
+        'end': sub['end'],
+        'original_text': sub['text'],
+        'translated_text': translated_text
+    }
 
 def parse_srt(file_path):
-    """Parse SRT file into structured blocks"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    blocks = re.split(r'\n\s*\n', content.strip())
-    subtitles = []
-
-    for block in blocks:
-        if not block.strip():
-            continue
-
-        lines = [line.strip() for line in block.split('\n') if line.strip()]
-        if len(lines) < 3:
-            continue
-
-        subtitles.append({
-            'num': lines[0],
-            'timecode': lines[1],
-            'text': '\n'.join(lines[2:])  
-        })
-
-    return subtitles
-
-def save_progress(subtitles, output_path, batch_file=None):
-    """Save translated subtitles (full or partial)"""
-    if batch_file:
-        with open(batch_file, 'w', encoding='utf-8') as f:
-            json.dump(subtitles, f)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for sub in subtitles:
-            f.write(f"{sub['num']}\n{sub['timecode']}\n{sub['translated_text']}\n\n")
+    """Parse an SRT (or WebVTT) file into structured blocks"""
+    return [
+        {
+            'num': cue.num,
+            'start': cue.start,
+            'end': cue.end,
+            'text': cue.text
+        }
+        for cue in iter_subtitles(file_path)
+        if cue.text
+    ]
+
+def pack_subtitles(subtitles, max_chars=MAX_CHARS_PER_REQUEST):
+    """Group consecutive subtitles into packs that fit in one request"""
+    pack, size = [], 0
+    for sub in subtitles:
+        cost = len(sub['text']) + len(SEGMENT_MARKER.format(len(pack))) + 2
+        if pack and size + cost > max_chars:
+            yield pack
+            pack, size = [], 0
+            cost = len(sub['text']) + len(SEGMENT_MARKER.format(0)) + 2
+        pack.append(sub)
+        size += cost
+    if pack:
+        yield pack
+
+def join_segments(texts):
+    """Join cue texts into one request, each preceded by its numbered marker"""
+    return '\n'.join(f"{SEGMENT_MARKER.format(i)}\n{text}" for i, text in enumerate(texts))
+
+def split_segments(text, count):
+    """Split a translated pack back into cue texts.
+
+    Returns None unless exactly markers 0..count-1 come back in order with
+    non-empty text after each, so a garbled response never lands on the
+    wrong cue.
+    """
+    parts = SEGMENT_SPLIT.split(text)
+    if parts[0].strip() or len(parts) != 2 * count + 1:
+        return None
+    if [int(index) for index in parts[1::2]] != list(range(count)):
+        return None
+    segments = [part.strip() for part in parts[2::2]]
+    if not all(segments):
+        return None
+    return segments
+
+def save_progress(subtitles, output_path):
+    """Write translated subtitles (untranslated ones keep their original text).
+
+    output_path is a path (format from its extension) or a {format: path} mapping.
+    """
+    write_subtitles((
+        Cue(sub['num'], sub['start'], sub['end'], sub['translated_text'] if 'translated_text' in sub else sub['text'])
+        for sub in subtitles
+    ), output_path)
+
+def translate_srt(input_path, output_path, target_lang, memory_path=TRANSLATION_MEMORY,
+                  concurrency=WORKERS):
+    """Main translation workflow. Returns the run's stats (see translate_srt_multi)."""
+    return translate_srt_multi(input_path, {target_lang: output_path}, memory_path, concurrency)
+
+def fan_out_outputs(input_path, target_langs, output_dir=None):
+    """Default output paths for a fan-out run: <stem>.<lang>.srt"""
+    input_path = Path(input_path)
+    output_dir = Path(output_dir) if output_dir else input_path.parent
+    return {lang: output_dir / f"{input_path.stem}.{lang}.srt" for lang in target_langs}
+
+def translate_srt_multi(input_path, outputs, memory_path=TRANSLATION_MEMORY,
+                        concurrency=WORKERS):
+    """Translate one SRT into several languages in a single run.
 
-def load_progress(batch_file):
-    """Resume from saved batch file"""
-    with open(batch_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    `outputs` maps target language -> output path (see fan_out_outputs).
+    The source is parsed, language-detected and packed once; every target
+    shares the translation memory, provider health and rate limits, and
+    requests for different targets are interleaved.
 
-def translate_srt(input_path, output_path, target_lang):
-    """Main translation workflow"""
+    Returns a stats dict (timings, counts, memory hits, provider latencies),
+    which is also sent to the "translation" instrumentation hooks.
+    """
     # Setup
-    translator = SubtitleTranslator()
+    started = time.monotonic()
+    memory = TranslationMemory(memory_path) if memory_path else None
+    try:
+        return _translate_multi(SubtitleTranslator(memory), input_path, outputs, concurrency, started)
+    finally:
+        if memory is not None:
+            memory.close()  # Also on errors, so pending entries are committed
+
+def _translate_multi(translator, input_path, outputs, concurrency, started):
+    """translate_srt_multi with the translator (and its memory) already set up."""
     input_path = Path(input_path)
-    output_path = Path(output_path)
-    batch_file = input_path.with_suffix('.batch')
-    
-    # Initialize source_lang
+    memory = translator.memory
+
+    print("🔍 Parsing SRT file...")
+    subtitles = parse_srt(input_path)
+
+    # Auto-detect language from first 3 subtitles
     source_lang = 'auto'  # Default to 'auto' if not detected
+    if subtitles:
+        sample_text = ' '.join([s['text'] for s in subtitles[:3]])
+        source_lang = translator.detect_language(sample_text)
+        print(f"🌍 Detected source language: {source_lang}")
 
-    # Resume or start new
-    if batch_file.exists():
-        print("⏩ Resuming previous translation...")
-        subtitles = load_progress(batch_file)
-        remaining = [s for s in subtitles if 'translated_text' not in s]
-        # Attempt to detect language from existing subtitles if possible
-        if subtitles:
-            sample_text = ' '.join([s['text'] for s in subtitles[:3]])
-            source_lang = translator.detect_language(sample_text)
-            print(f"🌍 Detected source language: {source_lang}")
-    else:
-        print("🔍 Parsing SRT file...")
-        subtitles = parse_srt(input_path)
-        remaining = subtitles.copy()
-        
-        # Auto-detect language from first 3 subtitles
-        if subtitles:
-            sample_text = ' '.join([s['text'] for s in subtitles[:3]])
-            source_lang = translator.detect_language(sample_text)
-            print(f"🌍 Detected source language: {source_lang}")
-
-    # Process in batches
-    print(f"🔧 Translating {len(remaining)} subtitles to {target_lang}...")
-    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
-        for i in range(0, len(remaining), BATCH_SAVE_EVERY):
-            batch = remaining[i:i+BATCH_SAVE_EVERY]
-            
-            try:
-                results = list(executor.map(
-                    lambda s: translator.process_subtitle(s, target_lang, source_lang),
-                    batch
-                ))
-            except Exception as e:
-                print(f"⚠️ Failed to process batch {i//BATCH_SAVE_EVERY + 1}: {str(e)}")
-                continue
-            
-            # Update main list
-            for result in results:
-                idx = next(i for i, s in enumerate(subtitles) if s['num'] == result['num'])
-                subtitles[idx] = result
-            
-            # Save progress
-            save_progress(subtitles, output_path, batch_file)
-            print(f"✅ Saved batch {i//BATCH_SAVE_EVERY + 1} ({translator.translated_count} total)")
-    
-    # Final save
-    save_progress(subtitles, output_path)
-    batch_file.unlink(missing_ok=True)
+    positions = {id(sub): i for i, sub in enumerate(subtitles)}  # Pack entries are the source dicts
+    source_hash = file_hash(input_path)  # An edited source invalidates its journals
+    journals = {}
+    incomplete = set()  # Targets with subtitles left untranslated
+    translated = {}
+    jobs_by_lang = []
+
+    for target_lang in outputs:
+        # Resume from the checkpoint journal if a previous run was interrupted
+        journal = TranslationJournal(
+            input_path.with_suffix(f'.{target_lang}.journal'),
+            header={'source': input_path.name, 'hash': source_hash, 'target_lang': target_lang,
+                    'count': len(subtitles)}
+        )
+        done = journal.open()
+        if done:
+            print(f"⏩ Resuming {target_lang} ({len(done)} subtitles already done)...")
+        results = list(subtitles)
+        for i, translated_text in done.items():
+            results[i] = translated_result(subtitles[i], translated_text)
+        journals[target_lang] = journal
+        translated[target_lang] = results
+
+        # Pack consecutive subtitles into requests
+        remaining = [sub for sub, result in zip(subtitles, results) if result is sub]
+        packs = list(pack_subtitles(remaining))
+        print(f"🔧 Translating {len(remaining)} subtitles to {target_lang} in {len(packs)} requests...")
+        jobs_by_lang.append([(target_lang, pack) for pack in packs])
+
+    # Interleave targets so every language progresses at the same pace
+    jobs = [job for group in zip_longest(*jobs_by_lang) for job in group if job is not None]
+
+    def on_results(target_lang, pack, results):
+        for sub, result in zip(pack, results):
+            i = positions[id(sub)]
+            translated[target_lang][i] = result
+            if result['failed']:
+                incomplete.add(target_lang)  # Left out of the journal so a rerun retries it
+            else:
+                journals[target_lang].append(i, result['translated_text'])
+
+    from .async_translator import AsyncTranslationEngine
+    prepared = time.monotonic()
+    try:
+        AsyncTranslationEngine(translator, concurrency=concurrency).run_jobs(jobs, source_lang, on_results)
+    finally:
+        for journal in journals.values():
+            journal.close()
+
+    translated_at = time.monotonic()
+
+    # Write each output once, then drop its checkpoint unless subtitles are still missing
+    for target_lang, output_path in outputs.items():
+        save_progress(translated[target_lang], output_path)
+        if target_lang in incomplete:
+            print(f"⚠️ Keeping {journals[target_lang].path.name}: rerun to retry the failed {target_lang} subtitles")
+        else:
+            journals[target_lang].discard()
+
+    stats = translator.stats()
+    stats.update(
+        input=str(input_path),
+        outputs={lang: str(path) for lang, path in outputs.items()},
+        source_lang=source_lang,
+        cues=len(subtitles),
+        requests=len(jobs),
+        seconds={
+            'prepare': round(prepared - started, 3),
+            'translate': round(translated_at - prepared, 3),
+            'write': round(time.monotonic() - translated_at, 3)
+        }
+    )
     
     print(f"\n🎉 Translation complete!")
-    print(f"   Total: {len(subtitles)}")
+    print(f"   Total: {len(subtitles)} x {len(outputs)} languages")
     print(f"   Failed: {translator.failed_count}")
-    print(f"   Saved to: {output_path}")
-    
-if __name__ == "__main__":
-    translate_srt("input.srt", "translated.srt")
-
+    if memory is not None:
+        print(f"   Memory hits: {memory.hits}, misses: {memory.misses}")
+    for target_lang, output_path in outputs.items():
+        print(f"   Saved {target_lang} to: {output_path}")
+    emit('translation', stats)
+    return stats
 
+if __name__ == "__main__":
+    translate_srt("input.srt", "translated.srt", TARGET_LANG)
@@ -0,0 +1,249 @@
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from .formats import READ_EXTENSIONS
+
+# ======= CONFIGURATION =======
+SETTLE_SECONDS = 2.0  # A file must go this long without changing before it is processed
+POLL_SECONDS = 2.0  # Rescan interval when inotify isn't available (or on network shares)
+OPEN_WRITE_SECONDS = 60.0  # With inotify, how long a file still open for writing is waited for
+IN_FLIGHT_PER_WORKER = 2  # Jobs handed to the worker pool at once, per worker; the rest wait in the queue
+# =============================
+
+# inotify(7) constants
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+
+def _stamp(path):
+    """(size, mtime) of path, or None if it's gone"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def _is_subtitle(name):
+    return name.lower().endswith(READ_EXTENSIONS) and not name.startswith('.')
+
+
+class PollingSource:
+    """Finds changed files by comparing (size, mtime) between folder scans."""
+    name = 'polling'
+
+    def __init__(self, folders, recursive, interval=POLL_SECONDS):
+        self.folders = folders
+        self.recursive = recursive
+        self.interval = interval
+        self.stamps = {}
+        self.writing = {}  # Never known when polling
+        self.next_scan = 0.0
+
+    def scan(self):
+        """Every subtitle file under the folders, with its stamp."""
+        found = {}
+        for folder in self.folders:
+            for dirpath, dirnames, filenames in os.walk(folder):
+                for name in filenames:
+                    if _is_subtitle(name):
+                        path = os.path.join(dirpath, name)
+                        stamp = _stamp(path)
+                        if stamp:
+                            found[path] = stamp
+                if not self.recursive:
+                    break
+        self.stamps = found
+        self.next_scan = time.monotonic() + self.interval
+        return found
+
+    def wait(self, timeout):
+        """Paths that appeared or changed since the last scan (waits up to timeout)."""
+        delay = self.next_scan - time.monotonic()
+        if delay > timeout:
+            time.sleep(max(timeout, 0))
+            return []
+        if delay > 0:
+            time.sleep(delay)
+        previous = self.stamps
+        return [path for path, stamp in self.scan().items() if previous.get(path) != stamp]
+
+    def close(self):
+        pass
+
+
+class InotifySource:
+    """Linux inotify through libc: wakes up as soon as a file is written.
+
+    Raises OSError when inotify can't be used. It doesn't see writes made
+    by other machines to a network share; use PollingSource there.
+    """
+    name = 'inotify'
+
+    def __init__(self, folders, recursive):
+        import ctypes
+        import ctypes.util
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.ctypes = ctypes
+        self.recursive = recursive
+        self.folders = folders
+        self.dirs = {}  # Watch descriptor -> folder
+        self.writing = {}  # Path -> when it was first written without being closed yet
+        self.overflowed = False
+        try:
+            for folder in folders:
+                self.add_tree(folder)
+        except OSError:
+            self.close()
+            raise
+
+    def add_watch(self, folder):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            raise OSError(self.ctypes.get_errno(), f"Can't watch {folder}")
+        self.dirs[wd] = folder
+
+    def add_tree(self, folder):
+        """Watch folder (and its subfolders if recursive); returns the subtitle files already in it."""
+        found = []
+        for dirpath, dirnames, filenames in os.walk(folder):
+            self.add_watch(dirpath)
+            found.extend(os.path.join(dirpath, name) for name in filenames if _is_subtitle(name))
+            if not self.recursive:
+                break
+        return found
+
+    def scan(self):
+        found = {}
+        for folder in self.folders:
+            for dirpath, dirnames, filenames in os.walk(folder):
+                found.update((os.path.join(dirpath, name), None) for name in filenames if _is_subtitle(name))
+                if not self.recursive:
+                    break
+        return found
+
+    def wait(self, timeout):
+        """Paths with events since the last call (waits up to timeout for the first one)."""
+        if self.overflowed:  # Events were lost: report everything, the manifest skips what's unchanged
+            self.overflowed = False
+            return list(self.scan())
+        readable, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not readable:
+            return []
+        changed = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0').decode(sys.getfilesystemencoding(), 'surrogateescape')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                    continue
+                folder = self.dirs.get(wd)
+                if folder is None or not name:
+                    continue
+                path = os.path.join(folder, name)
+                if mask & IN_ISDIR:
+                    if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                        try:
+                            changed.extend(self.add_tree(path))  # Files may land before the watch does
+                        except OSError as e:
+                            print(f"⚠️ Not watching {path}: {e}")
+                elif _is_subtitle(name):
+                    if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                        self.writing.pop(path, None)
+                    elif mask & (IN_CREATE | IN_MODIFY):
+                        self.writing.setdefault(path, time.monotonic())
+                    changed.append(path)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class FolderWatcher:
+    """Reports subtitle files (.srt, .vtt) in the watched folders once they stop changing.
+
+    Every file already present counts as new when watching starts. A file
+    is ready after SETTLE_SECONDS without events and with the same
+    size/mtime as when it was last seen, so half-copied files are never
+    picked up; with inotify, files still open for writing also wait (up to
+    OPEN_WRITE_SECONDS). A file is reported again only after it changes again.
+    """
+
+    def __init__(self, folders, recursive=False, settle=SETTLE_SECONDS, poll_interval=POLL_SECONDS,
+                 ignore=(), polling=False):
+        folders = [str(Path(folder).resolve()) for folder in folders]
+        self.ignore = tuple(str(Path(folder).resolve()) + os.sep for folder in ignore)
+        self.settle = settle
+        self.source = None
+        if not polling:
+            try:
+                self.source = InotifySource(folders, recursive)
+            except (OSError, AttributeError) as e:  # AttributeError: libc without inotify
+                print(f"⚠️ inotify unavailable ({e}), polling every {poll_interval}s")
+        if self.source is None:
+            self.source = PollingSource(folders, recursive, poll_interval)
+        self.pending = {}  # Path -> (deadline, stamp)
+        for path in self.source.scan():
+            self.touch(path)
+
+    def touch(self, path):
+        """Restart path's quiet period."""
+        if path.startswith(self.ignore):
+            return
+        stamp = _stamp(path)
+        if stamp is None or stamp[0] == 0:
+            self.pending.pop(path, None)  # Gone, or created but not written yet
+            if stamp is None:
+                self.source.writing.pop(path, None)
+        else:
+            self.pending[path] = (time.monotonic() + self.settle, stamp)
+
+    def poll(self, timeout):
+        """Wait up to timeout seconds for events; return the paths that are ready."""
+        if self.pending:
+            timeout = min(timeout, max(min(deadline for deadline, _ in self.pending.values()) - time.monotonic(), 0))
+        for path in self.source.wait(timeout):
+            self.touch(path)
+
+        ready = []
+        now = time.monotonic()
+        for path, (deadline, stamp) in list(self.pending.items()):
+            if deadline > now:
+                continue
+            opened = self.source.writing.get(path)
+            if opened is not None and now - opened < OPEN_WRITE_SECONDS:
+                self.touch(path)  # The writer paused but hasn't closed the file
+            elif _stamp(path) != stamp:  # Still being written (or removed) without an event reaching us
+                self.touch(path)
+            else:
+                self.source.writing.pop(path, None)
+                del self.pending[path]
+                ready.append(path)
+        return ready
+
+    def close(self):
+        self.source.close()
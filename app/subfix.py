@@ -0,0 +1,309 @@
+"""Headless batch runner.
+
+    python subfix.py [options] INPUT [INPUT ...]
+
+INPUT can be .srt/.vtt files, folders (their subtitle files) or glob
+patterns. Settings use the same schema as settings.json; --formats (or
+the "output" settings block) picks which formats each file is written in.
+
+With --lint nothing is written: every cue is checked against the timing
+and formatting rules and the violations are reported (--report takes a
+.json or .csv path).
+
+With --watch the INPUT folders are watched instead, and every .srt file
+dropped or changed in them is processed once it has stopped changing,
+until Ctrl+C or SIGTERM. Stages default to the "watch" settings block.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from pathlib import Path
+from config import load_settings, SETTINGS_FILE
+from processors.pipeline import STAGES, run_pipeline
+from processors.instrumentation import FileStats, write_report
+from processors.manifest import Manifest, input_state, run_key
+from processors.formats import FORMATS, READ_EXTENSIONS, output_paths
+
+def collect_inputs(patterns, recursive=False):
+    """Expand files, folders and globs into a sorted, de-duplicated list of subtitle files."""
+    found = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            walker = path.rglob('*') if recursive else path.iterdir()
+            found.update(p for p in walker if p.is_file() and p.suffix.lower() in READ_EXTENSIONS)
+        elif path.is_file():
+            found.add(path)
+        else:
+            found.update(Path(p) for p in glob.glob(pattern, recursive=True)
+                         if p.lower().endswith(READ_EXTENSIONS) and os.path.isfile(p))
+    return sorted(p.resolve() for p in found)
+
+def output_path_for(input_file, out_folder, suffix):
+    """Same naming as the GUI: <out_folder>/<stem><suffix>.srt"""
+    return Path(out_folder) / f"{Path(input_file).stem}{suffix}.srt"
+
+def outputs_for(input_file, args):
+    """{format: path} for every format requested, all from the same base name."""
+    return {name: str(path) for name, path in
+            output_paths(output_path_for(input_file, args.output_dir, args.suffix), args.formats).items()}
+
+def process_file(job):
+    """Worker entry point. Never raises; returns (input, outputs, cues, error, stats dict,
+    input state for Manifest.record, taken before the input was read)."""
+    input_file, output_file, stages, settings = job
+    stats = FileStats(input_file, ', '.join(output_file.values()))
+    state = None
+    try:
+        state = input_state(input_file)
+        count = run_pipeline(input_file, output_file, stages, settings, stats=stats)
+        return input_file, output_file, count, None, stats.to_dict(), state
+    except Exception as e:
+        stats.error = f"{type(e).__name__}: {e}"
+        return input_file, output_file, 0, stats.error, stats.to_dict(), state
+
+def _ignore_interrupts():
+    """Pool initializer: Ctrl+C stops the watcher, which lets running files finish."""
+    import signal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def watch(folders, stages, settings, args):
+    """Process files as they land in `folders` until interrupted.
+
+    Ready files wait in a de-duplicated queue, so a burst of events for the
+    same file collapses into one job, and at most workers * IN_FLIGHT_PER_WORKER
+    jobs are handed to the pool at a time. Files changed while being
+    processed are processed again afterwards.
+    """
+    import signal
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from concurrent.futures.process import BrokenProcessPool
+    from processors.watcher import FolderWatcher, IN_FLIGHT_PER_WORKER, POLL_SECONDS, SETTLE_SECONDS
+
+    options = settings.get("watch", {})
+    os.makedirs(args.output_dir, exist_ok=True)
+    watcher = FolderWatcher(folders, args.recursive, options.get("settle_seconds", SETTLE_SECONDS),
+                            options.get("poll_seconds", POLL_SECONDS), ignore=[args.output_dir], polling=args.poll)
+    manifest = Manifest.for_folder(args.output_dir)
+    key = run_key(stages, settings)
+    workers = max(1, args.workers)
+    max_running = workers * IN_FLIGHT_PER_WORKER
+    queue = {}  # Ready inputs waiting for a worker, oldest first
+    running = {}  # Future -> input
+    submitted_to = {}  # Future -> the pool running it
+    rerun = set()  # Inputs that changed again while running
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_ignore_interrupts)
+    print(f"Watching {', '.join(map(str, folders))} ({watcher.source.name}) -> {args.output_dir}, "
+          f"stages: {','.join(stages)}. Ctrl+C to stop.")
+
+    def finish(future):
+        nonlocal pool
+        input_file = running.pop(future)
+        broken_pool = submitted_to.pop(future)
+        try:
+            _, output_file, count, error, _, state = future.result()
+        except BrokenProcessPool as e:  # A worker died (e.g. out of memory)
+            error = f"{type(e).__name__}: {e}"
+            if broken_pool is pool:  # Every job of a broken pool fails; only the first replaces it
+                pool.shutdown(wait=False)
+                pool = ProcessPoolExecutor(max_workers=workers, initializer=_ignore_interrupts)
+        if error:
+            manifest.forget(input_file)
+            print(f"FAILED {input_file}: {error}", file=sys.stderr)
+        else:
+            manifest.record(input_file, output_file, key, state)
+            print(f"{input_file} -> {', '.join(output_file.values())} ({count} cues)")
+        if input_file in rerun:
+            rerun.discard(input_file)
+            queue[input_file] = None
+
+    try:
+        while not stopping:
+            for input_file in watcher.poll(0 if running else 1.0):
+                if input_file in running.values():
+                    rerun.add(input_file)
+                else:
+                    queue.pop(input_file, None)
+                    queue[input_file] = None
+
+            while queue and len(running) < max_running:
+                input_file = next(iter(queue))
+                del queue[input_file]
+                output_file = outputs_for(input_file, args)
+                if not args.force and manifest.is_current(input_file, output_file, key):
+                    continue
+                future = pool.submit(process_file, (input_file, output_file, stages, settings))
+                running[future] = input_file
+                submitted_to[future] = pool
+
+            if running:
+                done, _ = wait(list(running), timeout=0.25, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future)
+            if not running:
+                manifest.save()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if running:
+            print(f"Stopping: finishing {len(running)} file(s) in progress...")
+            for future in wait(list(running)).done:
+                finish(future)
+        pool.shutdown()
+        watcher.close()
+        manifest.save()
+    if queue:
+        print(f"Stopped with {len(queue)} file(s) still queued; they'll be picked up next time")
+    return 0
+
+def lint(files, settings, args):
+    """Read-only compliance check. Exit status 1 if any file has violations."""
+    from processors.compliance import lint_files, write_lint_csv, write_lint_json
+
+    results = []
+    for i, result in enumerate(lint_files(files, settings, args.workers), 1):
+        results.append(result)
+        if result['error']:
+            print(f"[{i}/{len(files)}] FAILED {result['file']}: {result['error']}", file=sys.stderr)
+        elif result['violations']:
+            counts = ', '.join(f"{rule} {n}" for rule, n in result['counts'].items() if n)
+            print(f"[{i}/{len(files)}] {result['file']}: {result['cues_with_violations']}/{result['cues']} cues ({counts})")
+
+    bad = sum(1 for result in results if result['violations'] or result['error'])
+    print(f"Checked {len(results)} files: {len(results) - bad} compliant, {bad} with violations or errors")
+    if args.report:
+        if args.report.lower().endswith('.csv'):
+            write_lint_csv(results, args.report)
+        else:
+            write_lint_json(results, args.report)
+        print(f"Report saved to {args.report}")
+    return 1 if bad else 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='subfix', description="Batch-process subtitle files.")
+    parser.add_argument('inputs', nargs='+', help=".srt files, folders or glob patterns")
+    parser.add_argument('-s', '--stages',
+                        help=f"comma-separated stages to run (default: {','.join(STAGES)}; "
+                             "with --watch, the \"watch\" settings)")
+    parser.add_argument('-c', '--settings', default=SETTINGS_FILE,
+                        help="settings.json to read timing/formatting from")
+    parser.add_argument('-o', '--output-dir', default='output', help="output folder (default: output)")
+    parser.add_argument('--suffix', default='_processed', help="output name suffix (default: _processed)")
+    parser.add_argument('--formats',
+                        help=f"comma-separated output formats, written in one pass ({', '.join(FORMATS)}; "
+                             "default: the \"output\" settings, srt)")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="parallel worker processes (default: CPU count)")
+    parser.add_argument('-r', '--recursive', action='store_true', help="search folders recursively")
+    parser.add_argument('-f', '--force', action='store_true',
+                        help="reprocess every file, even ones unchanged since the last run")
+    parser.add_argument('--report', help="write a JSON report with per-file, per-stage timings to this path")
+    parser.add_argument('--lint', action='store_true',
+                        help="only check files against the timing/formatting rules; write nothing but the report")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and process subtitle files as they are added to or changed in the INPUT folders")
+    parser.add_argument('--poll', action='store_true',
+                        help="with --watch, rescan the folders instead of using inotify (needed for network shares)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    settings = load_settings(args.settings)
+    if args.stages:
+        stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    elif args.watch:
+        stages = list(settings.get("watch", {}).get("stages", STAGES))
+    else:
+        stages = list(STAGES)
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        print(f"Unknown stage(s): {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    if args.formats:
+        args.formats = [name.strip() for name in args.formats.split(',') if name.strip()]
+    else:
+        args.formats = list(settings.get("output", {}).get("formats", ["srt"]))
+    unknown = set(args.formats) - set(FORMATS)
+    if unknown or not args.formats:
+        print(f"Unknown format(s): {', '.join(sorted(unknown)) or 'none given'}", file=sys.stderr)
+        return 2
+
+    if args.watch:
+        folders = [Path(folder) for folder in args.inputs]
+        missing = [str(folder) for folder in folders if not folder.is_dir()]
+        if missing:
+            print(f"Not a folder: {', '.join(missing)}", file=sys.stderr)
+            return 2
+        return watch(folders, stages, settings, args)
+
+    files = collect_inputs(args.inputs, args.recursive)
+    if not files:
+        print("No subtitle files found", file=sys.stderr)
+        return 2
+    if args.lint:
+        return lint(files, settings, args)
+
+    # Refuse to let two inputs write the same output
+    outputs = {}
+    for input_file in files:
+        outputs.setdefault(output_path_for(input_file, args.output_dir, args.suffix), []).append(input_file)
+    clashes = {out: ins for out, ins in outputs.items() if len(ins) > 1}
+    if clashes:
+        for out, ins in clashes.items():
+            print(f"Output clash: {out} <- {', '.join(map(str, ins))}", file=sys.stderr)
+        return 2
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = [(str(input_file), outputs_for(input_file, args), stages, settings) for input_file in files]
+
+    # Skip files whose content and relevant settings haven't changed since their output was written
+    manifest = Manifest.for_folder(args.output_dir)
+    key = run_key(stages, settings)
+    skipped = []
+    if not args.force:
+        current = [manifest.is_current(job[0], job[1], key) for job in jobs]
+        skipped = [job for job, is_current in zip(jobs, current) if is_current]
+        jobs = [job for job, is_current in zip(jobs, current) if not is_current]
+        if skipped:
+            print(f"Skipping {len(skipped)} unchanged file(s) (use --force to reprocess)")
+
+    failures = 0
+    file_stats = []
+    started = time.monotonic()
+    workers = max(1, min(args.workers, len(jobs) or 1))
+    if workers == 1:
+        results = map(process_file, jobs)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(process_file, jobs, chunksize=max(1, len(jobs) // (workers * 8)))
+
+    for i, (input_file, output_file, count, error, stats, state) in enumerate(results, 1):
+        file_stats.append(stats)
+        if error:
+            failures += 1
+            manifest.forget(input_file)
+            print(f"[{i}/{len(jobs)}] FAILED {input_file}: {error}", file=sys.stderr)
+        else:
+            manifest.record(input_file, output_file, key, state)
+            print(f"[{i}/{len(jobs)}] {input_file} -> {', '.join(output_file.values())} ({count} cues)")
+
+    if workers > 1:
+        pool.shutdown()
+
+    manifest.save()
+    print(f"Done: {len(jobs) - failures} ok, {failures} failed, {len(skipped)} unchanged")
+    if args.report:
+        write_report(args.report, file_stats, stages=stages, workers=workers,
+                     skipped=[job[0] for job in skipped],
+                     wall_seconds=round(time.monotonic() - started, 3))
+        print(f"Report saved to {args.report}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,50 +1,26 @@
 import PySimpleGUI as sg
 import os
 from pathlib import Path
-import json
 # from processors.translator import translate_srt  # Commented out translation import
-from processors.spellchecker import spellcheck_srt
-from processors.sdh_cleaner import remove_hi_tags
-from processors.timing_editor import adjust_timings
-import re
-from datetime import datetime, timedelta
-from spellchecker import SpellChecker
-import re
+# Stage modules (spellchecker, NumPy, ...) load on first use, see pipeline.build_stages
+from processors.pipeline import run_pipeline, PipelineCancelled
+from processors.subtitles import count_cues
+from processors.formats import READ_EXTENSIONS, output_paths
+from processors.manifest import Manifest, input_state, run_key
+import threading
+from config import load_settings, save_settings
 
-# ========================
-#      CONFIGURATION
-# ========================
-DEFAULT_SETTINGS = {
-    "theme": "DarkBlue3",
-    "translation": {
-        "target_lang": "es"  # Commented out translation settings
-    },
-    "timing": {
-        "min_duration": 0.6,
-        "max_duration": 8.0,
-        "gap_between": 0.066,
-        "chars_per_sec": 25
-    },
-    "formatting": {
-        "chars_per_line": 43,
-        "max_lines": 2
-    }
+# Pipeline stage name -> GUI toggle button
+STAGE_BUTTONS = {
+    "spellcheck": "-SPELLCHECK-",
+    "remove_sdh": "-REMOVE_SDH-",
+    "adjust_timings": "-ADJUST_TIMINGS-"
 }
+STOP_TIMEOUT = 10  # Seconds to wait for a cancelled batch once the window is gone
 
 # ========================
 #        GUI SETUP
 # ========================
-def load_settings():
-    try:
-        with open('settings.json', 'r') as f:
-            return json.load(f)
-    except:
-        return DEFAULT_SETTINGS
-
-def save_settings(settings):
-    with open('settings.json', 'w') as f:
-        json.dump(settings, f)
-
 def create_window(settings):
     # Set a black-and-white theme
     sg.theme("DarkGrey5")  # Predefined black-and-white theme
@@ -95,12 +71,80 @@ def create_window(settings):
         [sg.StatusBar("Ready to process files", key="-STATUS-")],
         
         [sg.Button("Run All", size=10), 
+         sg.Button("Cancel", size=10, disabled=True),
          sg.Button("Theme", size=10),
          sg.Button("Exit", size=10)]
     ]
     
     return sg.Window("SubFix", layout)  # Updated app name in the window title
 
+# ========================
+#    BACKGROUND WORKER
+# ========================
+def run_batch(window, files, out_folder, stages, settings, cancel):
+    """Process files off the GUI thread, posting progress events to the window.
+
+    Events: "-FILE-START-", "-FILE-PROGRESS-", "-FILE-DONE-", "-BATCH-DONE-".
+    Stops cleanly between cues once `cancel` is set. Files unchanged since
+    their output was written (same content and settings) are skipped.
+    Every format in settings["output"]["formats"] is written from one pass.
+    """
+    total_files = len(files)
+    failed = []
+    processed = 0
+    manifest = Manifest.for_folder(out_folder)
+    key = run_key(stages, settings)
+
+    for i, infile in enumerate(files):
+        if cancel.is_set():
+            break
+        name = Path(infile).name
+        outfile = output_paths(os.path.join(out_folder, f"{Path(infile).stem}_processed.srt"),
+                               settings.get("output", {}).get("formats", ["srt"]))
+        if manifest.is_current(infile, outfile, key):
+            window.write_event_value("-FILE-DONE-", (i, total_files, name, None))
+            continue
+        try:
+            total_cues = max(count_cues(infile), 1)
+        except OSError:
+            total_cues = 1
+        window.write_event_value("-FILE-START-", (i, total_files, name))
+
+        def progress(counts, elapsed):
+            window.write_event_value("-FILE-PROGRESS-", (i, total_files, name, counts, total_cues, elapsed))
+
+        try:
+            state = input_state(infile)  # Before reading, so edits made meanwhile aren't recorded as done
+            run_pipeline(infile, outfile, stages, settings, progress=progress, cancel=cancel)
+            manifest.record(infile, outfile, key, state)
+            processed += 1
+            window.write_event_value("-FILE-DONE-", (i, total_files, name, None))
+        except PipelineCancelled:
+            break
+        except Exception as e:
+            manifest.forget(infile)
+            failed.append(f"{name}: {e}")
+            window.write_event_value("-FILE-DONE-", (i, total_files, name, str(e)))
+
+    manifest.save()
+    window.write_event_value("-BATCH-DONE-", (processed, failed, cancel.is_set(), out_folder))
+
+def stop_worker(window, worker, cancel):
+    """Cancel a running batch and wait for it to finish.
+
+    The worker posts its events through the window, so the event loop keeps
+    being pumped until "-BATCH-DONE-" arrives; joining straight away could
+    deadlock. If the window is already closed, wait at most STOP_TIMEOUT.
+    """
+    cancel.set()
+    if worker is None:
+        return
+    while worker.is_alive():
+        event, _ = window.read(timeout=100)
+        if event in ("-BATCH-DONE-", sg.WIN_CLOSED):
+            break
+    worker.join(STOP_TIMEOUT)
+
 # ========================
 #      MAIN APP LOGIC
 # ========================
@@ -115,21 +159,25 @@ def main():
         "-REMOVE_SDH-": False,
         "-ADJUST_TIMINGS-": False
     }
+    cancel = threading.Event()
+    worker = None
     
     while True:
         event, values = window.read()
         
         if event in (sg.WIN_CLOSED, "Exit"):
+            stop_worker(window, worker, cancel)
             break
             
         elif event == "Theme":
+            stop_worker(window, worker, cancel)  # Don't quit while a file is half written
             settings["theme"] = "DarkBlue3" if settings["theme"] == "SystemDefault" else "SystemDefault"
             save_settings(settings)
             sg.popup("Theme changed", "Please restart the application")
             break
             
         elif event == "Add Files":
-            new_files = sg.popup_get_file("Select subtitle files", multiple_files=True, file_types=(("SRT Files", "*.srt"),))
+            new_files = sg.popup_get_file("Select subtitle files", multiple_files=True, file_types=(("Subtitle Files", "*.srt *.vtt"),))
             if new_files:
                 files_to_process.extend(new_files.split(";"))
                 window["-FILELIST-"].update(files_to_process)
@@ -137,7 +185,7 @@ def main():
         elif event == "Add Folder":
             folder = sg.popup_get_folder("Select folder with SRT files")
             if folder:
-                new_files = [os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith('.srt')]
+                new_files = [os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(READ_EXTENSIONS)]
                 files_to_process.extend(new_files)
                 window["-FILELIST-"].update(files_to_process)
                 
@@ -163,7 +211,7 @@ def main():
             # Handle drag-and-drop of files
             dropped_files = values["-FILEDROP-"].split(";")
             for file in dropped_files:
-                if file.lower().endswith(".srt"):  # Only add .srt files
+                if file.lower().endswith(READ_EXTENSIONS):  # Only add subtitle files
                     files_to_process.append(file)
             window["-FILELIST-"].update(files_to_process)
             
@@ -185,42 +233,62 @@ def main():
             }
             save_settings(settings)
             
-            # Process files
+            # Process files in the background so the window stays responsive
             out_folder = values["-OUTFOLDER-"]
             os.makedirs(out_folder, exist_ok=True)
+            stages = [name for name, key in STAGE_BUTTONS.items() if button_states[key]]
+            if not stages:
+                sg.popup_error("No operations selected!")
+                continue
             
-            total_files = len(files_to_process)
-            for i, infile in enumerate(files_to_process):
-                try:
-                    window["-STATUS-"].update(f"Processing {i+1}/{total_files}: {Path(infile).name}")
-                    window["-PROGRESS-"].update((i+1)/total_files * 100)
-                    
-                    original_name = Path(infile).stem
-                    outfile = os.path.join(out_folder, f"{original_name}_processed.srt")
-                    
-                    # Apply selected operations
-                    if button_states["-SPELLCHECK-"]:
-                        spellcheck_srt(infile, outfile)
-                    if button_states["-REMOVE_SDH-"]:
-                        remove_hi_tags(infile, outfile)
-                    if button_states["-ADJUST_TIMINGS-"]:
-                        adjust_timings(
-                            infile, outfile,
-                            min_duration=settings["timing"]["min_duration"],
-                            max_duration=settings["timing"]["max_duration"],
-                            min_gap=settings["timing"]["gap_between"],
-                            chars_per_sec=settings["timing"]["chars_per_sec"],
-                            chars_per_line=settings["formatting"]["chars_per_line"],
-                            max_lines=settings["formatting"]["max_lines"]
-                        )
-                        
-                except Exception as e:
-                    sg.popup_error(f"Failed to process {Path(infile).name}:\n{str(e)}")
-                    continue
-                    
-            window["-STATUS-"].update(f"Done! Processed {total_files} files")
-            sg.popup("Batch complete", f"Processed {total_files} files\nSaved to: {out_folder}")
+            cancel.clear()
+            window["Run All"].update(disabled=True)
+            window["Cancel"].update(disabled=False)
+            worker = threading.Thread(
+                target=run_batch,
+                args=(window, list(files_to_process), out_folder, stages, settings, cancel),
+                daemon=True
+            )
+            worker.start()
+            
+        elif event == "Cancel":
+            cancel.set()
+            window["-STATUS-"].update("Cancelling...")
+            
+        elif event == "-FILE-START-":
+            i, total_files, name = values[event]
+            window["-STATUS-"].update(f"Processing {i+1}/{total_files}: {name}")
+            window["-PROGRESS-"].update(i / total_files * 100)
+            
+        elif event == "-FILE-PROGRESS-":
+            i, total_files, name, counts, total_cues, elapsed = values[event]
+            written = counts["written"]
+            rate = written / elapsed if elapsed > 0 else 0
+            stage_counts = ", ".join(f"{stage} {n}" for stage, n in counts.items() if stage != "written")
+            window["-STATUS-"].update(
+                f"Processing {i+1}/{total_files}: {name} - {written}/{total_cues} cues "
+                f"({stage_counts}) {rate:,.0f} cues/s"
+            )
+            window["-PROGRESS-"].update((i + min(written / total_cues, 1)) / total_files * 100)
+            
+        elif event == "-FILE-DONE-":
+            i, total_files, name, error = values[event]
+            window["-PROGRESS-"].update((i + 1) / total_files * 100)
+            
+        elif event == "-BATCH-DONE-":
+            processed, failed, cancelled, out_folder = values[event]
+            worker = None
+            window["Run All"].update(disabled=False)
+            window["Cancel"].update(disabled=True)
             window["-PROGRESS-"].update(0)
+            if cancelled:
+                window["-STATUS-"].update(f"Cancelled after {processed} files")
+            else:
+                window["-STATUS-"].update(f"Done! Processed {processed} files")
+            if failed:
+                sg.popup_error("Some files failed:\n" + "\n".join(failed))
+            if not cancelled:
+                sg.popup("Batch complete", f"Processed {processed} files\nSaved to: {out_folder}")
             
     window.close()
 
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app runs from app/ and imports processors.* from there
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
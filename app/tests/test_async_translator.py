@@ -0,0 +1,145 @@
+"""AsyncTranslationEngine against a local stand-in for a LibreTranslate server."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from processors import async_translator, translator as translator_module
+from processors.async_translator import AsyncTranslationEngine, BURST
+from processors.provider_health import HealthTracker
+from processors.translation_memory import TranslationMemory
+from processors.translator import SubtitleTranslator
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Upper-cases `q`; answers 500 when it contains "fail"."""
+    hits = []
+
+    def do_POST(self):
+        text = parse_qs(urlparse(self.path).query)['q'][0]
+        self.hits.append(time.monotonic())
+        if 'fail' in text:
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps({'translatedText': text.upper()}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def libre(monkeypatch):
+    """A SubtitleTranslator whose only provider is Libre, pointed at the stand-in."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StandIn.hits = []
+    monkeypatch.setattr(translator_module, 'LIBRE_URL', f'http://127.0.0.1:{server.server_address[1]}/')
+    monkeypatch.setattr(translator_module, 'LIBRE_API_KEY', 'test')
+    monkeypatch.setattr(async_translator, 'backoff_delay', lambda attempt: 0)
+
+    translator = SubtitleTranslator()
+    translator.provider_order = [translator._try_libre]
+    translator.health = HealthTracker(failure_threshold=100)  # Keep the breaker out of these tests
+    yield translator
+    server.shutdown()
+    server.server_close()
+
+
+def subs(*texts):
+    return [{'num': str(i), 'start': i * 1000, 'end': i * 1000 + 900, 'text': text}
+            for i, text in enumerate(texts, 1)]
+
+
+def test_rate_limit_spaces_requests(libre):
+    rate, packs = 20.0, 10
+    engine = AsyncTranslationEngine(libre, concurrency=packs, rate_limits={'libre': rate})
+    results = []
+    engine.run([[sub] for sub in subs(*(f"line {i}" for i in range(packs)))], 'es', 'en',
+               lambda pack, pack_results: results.extend(pack_results))
+
+    assert len(StandIn.hits) == packs
+    # BURST requests go out at once, then one every 1/rate seconds
+    assert StandIn.hits[-1] - StandIn.hits[0] >= (packs - BURST) / rate * 0.9
+    assert sorted(result['translated_text'] for result in results) == [f"LINE {i}" for i in range(packs)]
+    assert libre.translated_count == packs and libre.failed_count == 0
+
+
+def test_failed_subtitles_fall_back_to_source(libre):
+    engine = AsyncTranslationEngine(libre, rate_limits={'libre': 1000.0})
+    results = []
+    engine.run([subs("hello", "please fail")], 'es', 'en',
+               lambda pack, pack_results: results.extend(pack_results))
+
+    # The joined request fails, so each subtitle is retried on its own
+    assert [(result['translated_text'], result['failed']) for result in results] == [
+        ("HELLO", False), ("please fail", True)]
+    assert libre.translated_count == 1
+    assert libre.failed_count == 1
+
+
+def test_memory_is_looked_up_once_per_cue(libre, tmp_path):
+    libre.memory = TranslationMemory(tmp_path / 'memory.db')
+    engine = AsyncTranslationEngine(libre, rate_limits={'libre': 1000.0})
+    try:
+        engine.run([subs("hello", "please fail")], 'es', 'en')
+        # The joined request fails and each cue is retried alone, without a second lookup
+        assert (libre.memory.hits, libre.memory.misses) == (0, 2)
+    finally:
+        libre.memory.close()
+
+
+def test_job_that_raises_reports_its_pack_as_failed(libre, monkeypatch):
+    engine = AsyncTranslationEngine(libre, rate_limits={'libre': 1000.0})
+    translate_pack = engine.translate_pack
+
+    async def flaky(pack, target_lang, source_lang):
+        if pack[0]['text'] == "boom":
+            raise RuntimeError("provider bug")
+        return await translate_pack(pack, target_lang, source_lang)
+
+    monkeypatch.setattr(engine, 'translate_pack', flaky)
+    results = []
+    engine.run([subs("hello"), subs("boom", "bang")], 'es', 'en',
+               lambda pack, pack_results: results.extend(pack_results))
+
+    assert sorted((result['translated_text'], result['failed']) for result in results) == [
+        ("HELLO", False), ("bang", True), ("boom", True)]
+    assert libre.failed_count == 2
+
+
+def test_open_breakers_wait_for_a_trial_instead_of_failing(libre):
+    libre.health = HealthTracker(failure_threshold=1, cooldown=0.3)
+    libre.health.record('libre', 0.1, False)  # Breaker open
+    engine = AsyncTranslationEngine(libre, rate_limits={'libre': 1000.0})
+    results = []
+    engine.run([subs("hello")], 'es', 'en', lambda pack, pack_results: results.extend(pack_results))
+
+    assert [result['translated_text'] for result in results] == ["HELLO"]
+    assert libre.failed_count == 0
+
+
+def test_content_errors_do_not_open_the_breaker(libre):
+    from deep_translator.exceptions import TranslationNotFound
+
+    def _try_libre(text, source_lang, target_lang):
+        if 'bad' in text:
+            raise TranslationNotFound(text)
+        return text.upper()
+
+    libre.provider_order = [_try_libre]
+    libre.health = HealthTracker(failure_threshold=1)
+    engine = AsyncTranslationEngine(libre, rate_limits={'libre': 1000.0})
+    results = []
+    engine.run([subs("one", "bad", "two")], 'es', 'en', lambda pack, pack_results: results.extend(pack_results))
+
+    assert [result['translated_text'] for result in results] == ["ONE", "bad", "TWO"]
+    assert libre.health.allow('libre')
+    assert libre.failed_count == 1
@@ -0,0 +1,41 @@
+"""Lint agrees with adjust_timings: it only flags what the fixer leaves behind by design."""
+from processors.compliance import lint_file
+from processors.timing_editor import adjust_timings
+
+SETTINGS = {
+    'timing': {'min_duration': 0.6, 'max_duration': 8.0, 'gap_between': 0.066, 'chars_per_sec': 25},
+    'formatting': {'chars_per_line': 43, 'max_lines': 2}
+}
+
+SOURCE = """1
+00:00:01,000 --> 00:00:01,200
+A line that takes well over a second to read at this speed.
+
+2
+00:00:05,000 --> 00:00:05,100
+Short.
+
+3
+00:00:10,000 --> 00:00:10,500
+This cue is trimmed to make room for the next one, too soon.
+
+4
+00:00:11,000 --> 00:00:12,000
+Next.
+"""
+
+
+def lint_fixed(tmp_path, source):
+    infile, outfile = tmp_path / 'in.srt', tmp_path / 'out.srt'
+    infile.write_text(source, encoding='utf-8')
+    timing, formatting = SETTINGS['timing'], SETTINGS['formatting']
+    adjust_timings(str(infile), str(outfile), timing['min_duration'], timing['max_duration'],
+                   timing['gap_between'], timing['chars_per_sec'],
+                   formatting['chars_per_line'], formatting['max_lines'])
+    return lint_file(outfile, SETTINGS)
+
+
+def test_extended_cues_pass_and_trimmed_cue_is_reported(tmp_path):
+    result = lint_fixed(tmp_path, SOURCE)
+    assert result['error'] is None
+    assert [(v['cue'], v['rule']) for v in result['details']] == [('3', 'reading_speed')]
@@ -0,0 +1,36 @@
+"""Manifest records the input as it was when processing started."""
+import subfix
+from processors.manifest import Manifest, input_state
+
+
+def write_cues(path, count):
+    path.write_text(''.join(f"{i}\n00:00:{i:02d},000 --> 00:00:{i:02d},500\nline {i}\n\n"
+                            for i in range(1, count + 1)), encoding='utf-8')
+
+
+def test_unchanged_input_is_current(tmp_path):
+    source, output = tmp_path / 'in.srt', tmp_path / 'out.srt'
+    write_cues(source, 50)
+    state = input_state(source)
+    write_cues(output, 50)
+    manifest = Manifest.for_folder(tmp_path)
+    manifest.record(source, output, 'key', state)
+    assert manifest.is_current(source, output, 'key')
+
+
+def test_input_edited_while_processing_is_not_current(tmp_path, monkeypatch):
+    source, output = tmp_path / 'in.srt', tmp_path / 'out.srt'
+    write_cues(source, 50)
+
+    def run_pipeline(input_file, output_file, stages, settings, stats=None):
+        write_cues(output, 50)
+        write_cues(source, 80)  # Edited after it was read
+        return 50
+
+    monkeypatch.setattr(subfix, 'run_pipeline', run_pipeline)
+    input_file, output_file, count, error, _, state = subfix.process_file((str(source), {'srt': str(output)}, [], {}))
+    assert error is None
+
+    manifest = Manifest.for_folder(tmp_path)
+    manifest.record(input_file, output_file, 'key', state)
+    assert not manifest.is_current(input_file, output_file, 'key')
@@ -0,0 +1,35 @@
+"""SDHCleaner keeps dialogue that only looks like an annotation."""
+import pytest
+
+from processors.sdh_cleaner import SDHCleaner
+from processors.subtitles import Cue
+
+
+def clean(text, **options):
+    cue = SDHCleaner(**options).clean_cue(Cue('1', 0, 1000, text))
+    return None if cue is None else cue.text
+
+
+@pytest.mark.parametrize('text', [
+    'OK: fine',
+    'I: am here',
+    'See you (in the morning)',
+    'He said (quietly): go',
+])
+def test_dialogue_is_kept(text):
+    assert clean(text) == text
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('JOHN: Hi', 'Hi'),
+    ('- MAN ON PHONE: Yes\n- Hello', '- Yes\n- Hello'),
+    ('[door] Come in', 'Come in'),
+    ('(sighs) Fine', 'Fine'),
+    ('[Music]', None),
+])
+def test_annotations_are_stripped(text, expected):
+    assert clean(text) == expected
+
+
+def test_any_tag_strips_every_bracket():
+    assert clean('[door slams] See you (in the morning)', any_tag=True) == 'See you'
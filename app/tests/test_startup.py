@@ -0,0 +1,11 @@
+"""Entry points import within IMPORT_BUDGET and leave the heavy modules unloaded."""
+import pytest
+
+from benchmark import IMPORT_BUDGET, measure_import
+
+
+@pytest.mark.parametrize('module, budget', IMPORT_BUDGET.items())
+def test_import_budget(module, budget):
+    seconds, loaded = measure_import(module)  # Best of REPEAT fresh interpreters
+    assert not loaded, f"{module} loads {loaded} at import time"
+    assert seconds <= budget, f"{module} imports in {seconds:.3f}s (budget {budget:.3f}s)"
@@ -0,0 +1,50 @@
+"""Watch mode processes a file again when it changes while being processed."""
+import argparse
+import os
+import signal
+import threading
+
+import subfix
+from processors.manifest import Manifest, run_key
+
+
+def write_cues(path, count):
+    path.write_text(''.join(f"{i}\n00:00:{i:02d},000 --> 00:00:{i:02d},500\nline {i}\n\n"
+                            for i in range(1, count + 1)), encoding='utf-8')
+
+
+def test_file_edited_during_processing_is_processed_again(tmp_path, monkeypatch):
+    inbox, outbox = tmp_path / 'in', tmp_path / 'out'
+    inbox.mkdir()
+    source = inbox / 'a.srt'
+    runs = tmp_path / 'runs.log'
+    write_cues(source, 50)
+
+    def run_pipeline(input_file, output_file, stages, settings, stats=None):
+        with open(runs, 'a') as f:  # Runs in a worker process
+            f.write('run\n')
+        with open(input_file, encoding='utf-8') as f:
+            count = f.read().count('-->')
+        write_cues(outbox / 'a_processed.srt', count)
+        if count == 50:
+            write_cues(source, 80)  # Edited while being processed
+        return count
+
+    monkeypatch.setattr(subfix, 'run_pipeline', run_pipeline)
+    settings = {'watch': {'settle_seconds': 0.2, 'poll_seconds': 0.1}}
+    args = argparse.Namespace(output_dir=str(outbox), recursive=False, poll=True, workers=1,
+                              force=False, suffix='_processed', formats=['srt'])
+    previous = signal.getsignal(signal.SIGTERM)
+    stop = threading.Timer(4.0, os.kill, (os.getpid(), signal.SIGTERM))
+    stop.start()
+    try:
+        subfix.watch([str(inbox)], [], settings, args)
+    finally:
+        stop.cancel()
+        signal.signal(signal.SIGTERM, previous)
+
+    with open(runs) as f:
+        assert f.read().count('run') == 2
+    output = outbox / 'a_processed.srt'
+    assert output.read_text(encoding='utf-8').count('-->') == 80
+    assert Manifest.for_folder(outbox).is_current(source, {'srt': str(output)}, run_key([], settings))